@@ -0,0 +1,80 @@
+import hashlib
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+
+from backend.routers import primary, replica
+
+
+def shared_key(key):
+    return f'auth:token:{hashlib.sha256(key.encode()).hexdigest()}'
+
+
+class TokenCache:
+    def __init__(self, size, ttl, shared=False):
+        self.size = size
+        self.ttl = ttl
+        self.shared = shared
+        self.tokens = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        if self.shared:
+            data = cache.get(shared_key(key))
+            return None if data is None else pickle.loads(data)
+        with self.lock:
+            entry = self.tokens.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self.tokens.move_to_end(key)
+                return pickle.loads(entry[1])
+            self.tokens.pop(key, None)
+        return None
+
+    def set(self, key, token):
+        data = pickle.dumps(token)
+        if self.shared:
+            cache.set(shared_key(key), data, self.ttl)
+        else:
+            self.store(key, data)
+
+    def store(self, key, data):
+        with self.lock:
+            self.tokens[key] = (time.monotonic() + self.ttl, data)
+            self.tokens.move_to_end(key)
+            while len(self.tokens) > self.size:
+                self.tokens.popitem(last=False)
+
+    def delete(self, *keys):
+        with self.lock:
+            for key in keys:
+                self.tokens.pop(key, None)
+        if self.shared:
+            cache.delete_many([shared_key(key) for key in keys])
+
+
+token_cache = TokenCache(settings.TOKEN_CACHE_SIZE, settings.TOKEN_CACHE_TTL,
+                         settings.TOKEN_CACHE_SHARED)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def authenticate_credentials(self, key):
+        token = token_cache.get(key)
+        if token is None:
+            token = self.load_token(key)
+            token_cache.set(key, token)
+        return token.user, token
+
+    def load_token(self, key):
+        try:
+            return super().authenticate_credentials(key)[1]
+        except AuthenticationFailed:
+            if replica.get() is None:
+                raise
+        with primary():
+            return super().authenticate_credentials(key)[1]
@@ -0,0 +1,126 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.http import quote_etag, urlencode
+
+from backend.routers import primary
+from recipes.versions import (CATALOG, RECIPES, author_key, catalog_version,
+                              get_versions, recipe_key)
+
+LIST_PARAMS = frozenset(('tags', 'author', 'page', 'limit'))
+HITS = 'recipes:cache:hits'
+MISSES = 'recipes:cache:misses'
+
+
+def count(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, timeout=None)
+
+
+def origin(request):
+    return request.build_absolute_uri('/')
+
+
+def list_cache_key(request):
+    params = request.query_params
+    if request.user.is_authenticated or not set(params) <= LIST_PARAMS:
+        return None
+    author = params.get('author', '')
+    if author and not author.isdigit():
+        return None
+    scope = author_key(author) if author else RECIPES
+    query = urlencode(sorted(
+        (name, sorted(params.getlist(name))) for name in params), doseq=True)
+    versions = get_versions(CATALOG, scope)
+    digest = hashlib.md5(f'{origin(request)}?{query}'.encode()).hexdigest()
+    return f'recipes:list:{versions[0]}:{versions[1]}:{digest}'
+
+
+def detail_cache_key(request, pk):
+    if request.user.is_authenticated or request.query_params:
+        return None
+    versions = get_versions(CATALOG, recipe_key(pk))
+    digest = hashlib.md5(origin(request).encode()).hexdigest()
+    return f'recipes:detail:{pk}:{versions[0]}:{versions[1]}:{digest}'
+
+
+def cached_data(key, build):
+    if key is None:
+        return build(), None
+    data = cache.get(key)
+    if data is not None:
+        count(HITS)
+        return data, 'HIT'
+    count(MISSES)
+    with primary():
+        data = build()
+    cache.set(key, data, settings.RECIPE_CACHE_TIMEOUT)
+    return data, 'MISS'
+
+
+def cache_stats():
+    stats = cache.get_many((HITS, MISSES))
+    return {'hits': stats.get(HITS, 0), 'misses': stats.get(MISSES, 0)}
+
+
+def document_key(recipe_id):
+    return f'recipes:document:{recipe_id}'
+
+
+def recipe_documents(recipe_ids, build):
+    version_keys = [CATALOG, *(recipe_key(pk) for pk in recipe_ids)]
+    cached = cache.get_many(
+        version_keys + [document_key(pk) for pk in recipe_ids])
+    missing_versions = [key for key in version_keys if key not in cached]
+    if missing_versions:
+        cached.update(zip(missing_versions, get_versions(*missing_versions)))
+    documents = {}
+    for pk in recipe_ids:
+        version = (cached[CATALOG], cached[recipe_key(pk)])
+        entry = cached.get(document_key(pk))
+        if entry is not None and entry[0] == version:
+            documents[pk] = entry[1]
+    missing = [pk for pk in recipe_ids if pk not in documents]
+    if missing:
+        with primary():
+            built = build(missing)
+        cache.set_many({
+            document_key(pk): (
+                (cached[CATALOG], cached[recipe_key(pk)]), document)
+            for pk, document in built.items()},
+            settings.RECIPE_CACHE_TIMEOUT)
+        documents.update(built)
+    return documents
+
+
+def overlay_user_flags(document, recipe, request):
+    return dict(
+        document,
+        image=document['image'] and request.build_absolute_uri(
+            document['image']),
+        image_variants={
+            variant: request.build_absolute_uri(url)
+            for variant, url in document['image_variants'].items()},
+        author=dict(document['author'],
+                    is_subscribed=recipe.author_is_subscribed),
+        is_in_shopping_cart=recipe.is_in_shopping_cart,
+        is_favorited=recipe.is_favorited)
+
+
+def make_etag(*parts):
+    return quote_etag(
+        hashlib.md5(':'.join(map(str, parts)).encode()).hexdigest())
+
+
+def catalog_etag(request, *args, **kwargs):
+    return make_etag(catalog_version(), request.get_full_path())
+
+
+def recipe_etag(recipe):
+    return make_etag(*get_versions(CATALOG, recipe_key(recipe.id)),
+                     recipe.updated_at.isoformat(),
+                     recipe.is_favorited, recipe.is_in_shopping_cart,
+                     recipe.author_is_subscribed)
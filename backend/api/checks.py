@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.core.checks import Error, register
+
+LOCAL_CACHES = ('django.core.cache.backends.locmem.LocMemCache',
+                'django.core.cache.backends.dummy.DummyCache')
+
+
+@register()
+def check_shared_cache(app_configs, **kwargs):
+    if settings.DEBUG or settings.CACHES['default']['BACKEND'] not in (
+            LOCAL_CACHES):
+        return []
+    return [Error(
+        'Recipe caches and version keys need a cache shared by all workers.',
+        hint='Set CACHE_BACKEND and CACHE_LOCATION to Redis or Memcached.',
+        id='api.E001')]
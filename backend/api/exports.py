@@ -0,0 +1,48 @@
+import csv
+import json
+
+from django.utils import timezone
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def shopping_list_txt(user, ingredients):
+    yield (f'Список покупок для пользователя: {user.username}\n\n'
+           f'Дата: {timezone.now():%Y-%m-%d}\n\n')
+    for ing in ingredients:
+        yield (f'{ing["ingredient__name"]}: {ing["ingredient_amount"]} '
+               f'{ing["ingredient__measurement_unit"]}\n')
+
+
+def shopping_list_csv(user, ingredients):
+    writer = csv.writer(Echo())
+    yield writer.writerow(('name', 'amount', 'measurement_unit'))
+    for ing in ingredients:
+        yield writer.writerow((ing['ingredient__name'],
+                               ing['ingredient_amount'],
+                               ing['ingredient__measurement_unit']))
+
+
+def shopping_list_json(user, ingredients):
+    yield ('{"user": %s, "date": "%s", "ingredients": ['
+           % (json.dumps(user.username, ensure_ascii=False),
+              f'{timezone.now():%Y-%m-%d}'))
+    separator = ''
+    for ing in ingredients:
+        yield separator + json.dumps({
+            'name': ing['ingredient__name'],
+            'amount': ing['ingredient_amount'],
+            'measurement_unit': ing['ingredient__measurement_unit'],
+        }, ensure_ascii=False)
+        separator = ', '
+    yield ']}'
+
+
+SHOPPING_LIST_EXPORTS = {
+    'txt': shopping_list_txt,
+    'csv': shopping_list_csv,
+    'json': shopping_list_json,
+}
@@ -0,0 +1,52 @@
+from django.core.files.uploadedfile import UploadedFile
+from drf_extra_fields.fields import Base64ImageField
+from rest_framework import serializers
+from rest_framework.fields import ImageField
+
+from recipes.storage import recipe_image_storage
+
+from .uploads import RequestTooLarge, check_upload_size
+
+
+class RecipeImageField(Base64ImageField):
+    def to_internal_value(self, data):
+        try:
+            if isinstance(data, UploadedFile):
+                check_upload_size(data.size)
+                return ImageField.to_internal_value(self, data)
+            if isinstance(data, str):
+                check_upload_size(len(data) * 3 // 4)
+        except RequestTooLarge as error:
+            raise serializers.ValidationError(error.detail)
+        return super().to_internal_value(data)
+
+
+class ImageVariantsField(serializers.ReadOnlyField):
+    def to_representation(self, value):
+        request = self.context.get('request')
+        urls = {}
+        for variant, name in value.items():
+            urls[variant] = recipe_image_storage.url(name)
+            if request is not None:
+                urls[variant] = request.build_absolute_uri(urls[variant])
+        return urls
+
+
+class PrimaryKeyListField(serializers.ListField):
+    child = serializers.IntegerField(min_value=1)
+
+    def __init__(self, queryset, **kwargs):
+        self.queryset = queryset
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        ids = list(dict.fromkeys(super().to_internal_value(data)))
+        objects = self.queryset.in_bulk(ids)
+        missing = [pk for pk in ids if pk not in objects]
+        if missing:
+            raise serializers.ValidationError(
+                f'Objects do not exist: {missing}')
+        return [objects[pk] for pk in ids]
+
+    def to_representation(self, value):
+        return [obj.pk for obj in value.all()]
@@ -1,11 +1,18 @@
 import django_filters
 from django.contrib.auth import get_user_model
+from rest_framework.filters import OrderingFilter
 
 from recipes.models import Ingredient, Recipe, Tag
+from recipes.pantry import recipe_ingredient_index
+from recipes.search import search_recipes
 
 User = get_user_model()
 
 
+class NumberInFilter(django_filters.BaseInFilter, django_filters.NumberFilter):
+    pass
+
+
 class IngredientsFilter(django_filters.FilterSet):
     name = django_filters.CharFilter(field_name='name',
                                      lookup_expr='istartswith')
@@ -15,12 +22,48 @@ class IngredientsFilter(django_filters.FilterSet):
         fields = ('name', 'measurement_unit')
 
 
+class RecipeOrderingFilter(OrderingFilter):
+    def get_ordering(self, request, queryset, view):
+        if (self.ordering_param not in request.query_params
+                and 'rank' in queryset.query.annotations):
+            return ('-rank', '-id')
+        return super().get_ordering(request, queryset, view)
+
+
 class RecipesFilter(django_filters.FilterSet):
     tags = django_filters.ModelMultipleChoiceFilter(field_name='tags__slug',
                                                     to_field_name='slug',
                                                     queryset=Tag.objects.all())
     author = django_filters.ModelChoiceFilter(queryset=User.objects.all())
+    search = django_filters.CharFilter(method='filter_search')
+    ingredients = NumberInFilter(method='filter_ingredient_sets')
+    exclude_ingredients = NumberInFilter(method='filter_ingredient_sets')
+    pantry = NumberInFilter(method='filter_ingredient_sets')
+    pantry_coverage = django_filters.NumberFilter(
+        method='filter_ingredient_sets', min_value=0, max_value=100)
 
     class Meta:
         model = Recipe
-        fields = ('tags', 'author')
+        fields = ('tags', 'author', 'search', 'ingredients',
+                  'exclude_ingredients', 'pantry', 'pantry_coverage')
+
+    def filter_search(self, queryset, name, value):
+        return search_recipes(queryset, value)
+
+    def filter_ingredient_sets(self, queryset, name, value):
+        return queryset
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        data = self.form.cleaned_data
+        if not any(data.get(name) for name in
+                   ('ingredients', 'exclude_ingredients', 'pantry')):
+            return queryset
+        coverage = data.get('pantry_coverage')
+        return recipe_ingredient_index.filter_queryset(
+            queryset,
+            include=[int(pk) for pk in data.get('ingredients') or ()],
+            exclude=[int(pk) for pk in data.get('exclude_ingredients') or ()],
+            pantry=([int(pk) for pk in data['pantry']]
+                    if data.get('pantry') else None),
+            coverage=100 if coverage is None else coverage)
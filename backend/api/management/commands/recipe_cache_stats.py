@@ -0,0 +1,23 @@
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+
+from api.cache import HITS, MISSES, cache_stats
+
+
+class Command(BaseCommand):
+    help = '''Статистика кэша ответов для списка и страниц рецептов.'''
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true',
+                            help='Обнулить счётчики после вывода.')
+
+    def handle(self, *args, **options):
+        stats = cache_stats()
+        total = stats['hits'] + stats['misses']
+        ratio = stats['hits'] / total if total else 0
+        self.stdout.write(f'hits: {stats["hits"]}, '
+                          f'misses: {stats["misses"]}, '
+                          f'hit ratio: {ratio:.1%}')
+        if options['reset']:
+            cache.delete_many((HITS, MISSES))
+            self.stdout.write(self.style.SUCCESS('Counters reset'))
@@ -0,0 +1,147 @@
+import json
+import math
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Count
+from django.test import Client, override_settings
+from rest_framework.authtoken.models import Token
+
+from api.middleware import QueryRecorder
+from recipes.models import Ingredient, Recipe, Tag
+
+User = get_user_model()
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(share * len(ordered)) - 1)]
+
+
+class Command(BaseCommand):
+    help = '''Замер задержек, пропускной способности и числа запросов
+    к базе для основных эндпоинтов API. Результат выводится в JSON.'''
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=100)
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument('--user', help='Имя пользователя для запросов.')
+        parser.add_argument('--scenario', action='append',
+                            help='Запустить только указанные сценарии.')
+        parser.add_argument('--output', help='Файл для результата.')
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations must be positive')
+        user = self.get_user(options['user'])
+        self.client = Client(HTTP_AUTHORIZATION=(
+            f'Token {Token.objects.get_or_create(user=user)[0].key}'))
+        scenarios = self.get_scenarios(user)
+        if options['scenario']:
+            unknown = set(options['scenario']) - scenarios.keys()
+            if unknown:
+                raise CommandError(f'Unknown scenarios: {sorted(unknown)}')
+            scenarios = {name: scenarios[name]
+                         for name in options['scenario']}
+        hosts = [*settings.ALLOWED_HOSTS, 'testserver']
+        with override_settings(ALLOWED_HOSTS=hosts,
+                               SQL_INSTRUMENTATION_SAMPLE_RATE=0):
+            results = {
+                name: self.run(requests, options['iterations'],
+                               options['warmup'])
+                for name, requests in scenarios.items()}
+        report = json.dumps({
+            'database': connections['default'].vendor,
+            'user': user.username,
+            'iterations': options['iterations'],
+            'dataset': {
+                'users': User.objects.count(),
+                'recipes': Recipe.objects.count(),
+                'ingredients': Ingredient.objects.count(),
+            },
+            'scenarios': results,
+        }, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(report)
+        self.stdout.write(report)
+
+    def get_user(self, username):
+        if username:
+            user = User.objects.filter(username=username).first()
+            if user is None:
+                raise CommandError(f'User "{username}" does not exist')
+            return user
+        user = User.objects.annotate(
+            subscriptions=Count('follower')).order_by(
+            '-subscriptions', 'id').first()
+        if user is None:
+            raise CommandError('No users, run generate_dataset first')
+        return user
+
+    def get_scenarios(self, user):
+        popular = list(Recipe.objects.order_by(
+            '-favorites_count', 'id').values_list('id', flat=True)[:20])
+        if not popular:
+            raise CommandError('No recipes, run generate_dataset first')
+        tags = list(Tag.objects.values_list('slug', flat=True)[:2])
+        prefixes = [name[:3] for name in Ingredient.objects.order_by(
+            'id').values_list('name', flat=True)[:20]]
+        filters = '&'.join(f'tags={slug}' for slug in tags)
+        target = Recipe.objects.exclude(favorites__user=user).values_list(
+            'id', flat=True).first()
+        return {
+            'recipe_list': lambda i: self.client.get(
+                f'/api/recipes/?page={i % 5 + 1}&limit=6'),
+            'recipe_list_filtered': lambda i: self.client.get(
+                f'/api/recipes/?{filters}&is_favorited={i % 2}&limit=6'),
+            'recipe_detail': lambda i: self.client.get(
+                f'/api/recipes/{popular[i % len(popular)]}/'),
+            'ingredient_search': lambda i: self.client.get(
+                '/api/ingredients/',
+                {'name': prefixes[i % len(prefixes)]}),
+            'subscriptions': lambda i: self.client.get(
+                '/api/users/subscriptions/?recipes_limit=3'),
+            'favorite_toggle': lambda i: (
+                self.client.post if i % 2 == 0 else self.client.delete)(
+                f'/api/recipes/{target}/favorite/'),
+            'cart_download': lambda i: self.client.get(
+                '/api/recipes/download_shopping_cart/'),
+        }
+
+    def run(self, request, iterations, warmup):
+        for number in range(warmup):
+            self.consume(request(number))
+        durations, queries, statuses = [], [], {}
+        started = time.perf_counter()
+        for number in range(iterations):
+            recorder = QueryRecorder()
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(recorder))
+                start = time.perf_counter()
+                response = request(warmup + number)
+                self.consume(response)
+                durations.append((time.perf_counter() - start) * 1000)
+            queries.append(recorder.count)
+            status = str(response.status_code)
+            statuses[status] = statuses.get(status, 0) + 1
+        elapsed = time.perf_counter() - started
+        return {
+            'p50_ms': round(percentile(durations, 0.5), 2),
+            'p95_ms': round(percentile(durations, 0.95), 2),
+            'p99_ms': round(percentile(durations, 0.99), 2),
+            'mean_ms': round(sum(durations) / len(durations), 2),
+            'throughput_rps': round(iterations / elapsed, 1),
+            'queries_per_request': round(sum(queries) / len(queries), 2),
+            'max_queries': max(queries),
+            'status_codes': statuses,
+        }
+
+    def consume(self, response):
+        if response.streaming:
+            b''.join(response.streaming_content)
@@ -0,0 +1,145 @@
+import hashlib
+import heapq
+import json
+import logging
+import random
+import re
+import sys
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.serializers import BaseSerializer
+
+from backend.routers import reading_from_replicas
+
+logger = logging.getLogger(__name__)
+
+PLACEHOLDERS = re.compile(r'\(\s*%s(?:\s*,\s*%s)*\s*\)')
+TRANSACTION_CONTROL = re.compile(
+    r'\s*(?:BEGIN|COMMIT|ROLLBACK|SAVEPOINT|RELEASE)\b', re.IGNORECASE)
+SKIPPED_PATHS = ('/django/', '/rest_framework/', '/django_filters/',
+                 '/djoser/', __file__)
+
+
+def query_shape(sql):
+    return PLACEHOLDERS.sub('(%s)', sql)
+
+
+def query_origin():
+    frame = sys._getframe(2)
+    source = None
+    while frame is not None:
+        code = frame.f_code
+        instance = frame.f_locals.get('self')
+        if isinstance(instance, BaseSerializer) and not any(
+                path in code.co_filename for path in SKIPPED_PATHS):
+            return f'{type(instance).__name__}.{code.co_name}'
+        if source is None and not any(
+                path in code.co_filename for path in SKIPPED_PATHS):
+            source = f'{frame.f_globals.get("__name__")}.{code.co_name}'
+        frame = frame.f_back
+    return source
+
+
+class QueryRecorder:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0
+        self.slowest = []
+        self.shapes = Counter()
+        self.repeated = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        if TRANSACTION_CONTROL.match(sql):
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.count += 1
+            self.duration += duration
+            item = (duration, self.count, sql)
+            if len(self.slowest) < settings.SQL_SLOWEST_QUERIES:
+                heapq.heappush(self.slowest, item)
+            else:
+                heapq.heappushpop(self.slowest, item)
+            shape = query_shape(sql)
+            self.shapes[shape] += 1
+            if self.shapes[shape] == settings.SQL_REPEATED_QUERY_THRESHOLD:
+                self.repeated[shape] = query_origin()
+
+    def server_timing(self):
+        return f'db;dur={self.duration * 1000:.1f};desc="{self.count} queries"'
+
+    def report(self, request, response):
+        return {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': self.count,
+            'db_ms': round(self.duration * 1000, 1),
+            'slowest': [
+                {'ms': round(duration * 1000, 1), 'sql': sql}
+                for duration, _, sql in sorted(self.slowest, reverse=True)],
+            'repeated': [
+                {'count': self.shapes[shape], 'origin': origin,
+                 'sql': shape}
+                for shape, origin in self.repeated.items()],
+        }
+
+
+class QueryInstrumentationMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= settings.SQL_INSTRUMENTATION_SAMPLE_RATE:
+            return self.get_response(request)
+        recorder = QueryRecorder()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        response['Server-Timing'] = recorder.server_timing()
+        if (recorder.repeated or recorder.duration * 1000
+                >= settings.SQL_SLOW_REQUEST_MS):
+            logger.warning(json.dumps(recorder.report(request, response),
+                                      ensure_ascii=False))
+        return response
+
+
+def pin_key(credentials):
+    return f'db:pin:{hashlib.sha256(credentials.encode()).hexdigest()}'
+
+
+class ReplicaPinMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+        credentials = request.META.get('HTTP_AUTHORIZATION')
+        if request.method not in SAFE_METHODS:
+            response = self.get_response(request)
+            if response.status_code < 400:
+                self.pin(credentials, response)
+            return response
+        if credentials and cache.get(pin_key(credentials)):
+            return self.get_response(request)
+        with reading_from_replicas():
+            return self.get_response(request)
+
+    def pin(self, credentials, response):
+        data = getattr(response, 'data', None)
+        if isinstance(data, dict) and data.get('auth_token'):
+            credentials = f'Token {data["auth_token"]}'
+        if credentials:
+            cache.set(pin_key(credentials), True,
+                      settings.REPLICA_PIN_SECONDS)
@@ -0,0 +1,20 @@
+import pytest
+
+from .query_budgets import QueryBudget
+
+budgets = []
+
+
+@pytest.fixture
+def query_budget():
+    budget = QueryBudget()
+    budgets.append(budget)
+    return budget
+
+
+def pytest_terminal_summary(terminalreporter):
+    lines = [line for budget in budgets for line in budget.report()]
+    if lines:
+        terminalreporter.write_sep('-', 'query budgets (actual/allowed)')
+        for line in lines:
+            terminalreporter.write_line(line)
@@ -0,0 +1,91 @@
+from contextlib import ExitStack
+
+from django.db import connections
+
+from .middleware import QueryRecorder
+
+QUERY_BUDGETS = {
+    ('tags-list', 'GET'): (3, 0),
+    ('tags-detail', 'GET'): (3, 0),
+    ('ingredients-list', 'GET'): (3, 0),
+    ('ingredients-detail', 'GET'): (3, 0),
+    ('recipes-list', 'GET'): (6, 0),
+    ('recipes-list', 'POST'): (10, 0),
+    ('recipes-detail', 'GET'): (5, 0),
+    ('recipes-detail', 'PATCH'): (17, 0),
+    ('recipes-detail', 'DELETE'): (14, 0),
+    ('recipes-changes', 'GET'): (6, 0),
+    ('recipes-favorite', 'POST'): (4, 0),
+    ('recipes-favorite', 'DELETE'): (3, 0),
+    ('recipes-favorite-bulk', 'POST'): (4, 0),
+    ('recipes-favorite-bulk', 'DELETE'): (5, 0),
+    ('recipes-shopping-cart', 'POST'): (7, 0),
+    ('recipes-shopping-cart', 'DELETE'): (6, 0),
+    ('recipes-shopping-cart-bulk', 'POST'): (7, 0),
+    ('recipes-shopping-cart-bulk', 'DELETE'): (8, 0),
+    ('recipes-download-shopping-cart', 'GET'): (2, 0),
+    ('recipes-shopping-cart-summary', 'GET'): (2, 0),
+    ('users-list', 'GET'): (4, 0),
+    ('users-detail', 'GET'): (3, 0),
+    ('users-me', 'GET'): (2, 0),
+    ('users-subscriptions', 'GET'): (4, 0),
+    ('users-subscribe', 'POST'): (6, 0),
+    ('users-subscribe', 'DELETE'): (6, 0),
+}
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def allowed_queries(view_name, method, page_size=0):
+    fixed, per_item = QUERY_BUDGETS[(view_name, method)]
+    return fixed + per_item * page_size
+
+
+def page_size(response):
+    data = getattr(response, 'data', None)
+    if isinstance(data, dict) and isinstance(data.get('results'), list):
+        return len(data['results'])
+    if isinstance(data, list):
+        return len(data)
+    return 0
+
+
+class QueryBudget:
+    def __init__(self):
+        self.results = []
+
+    def call(self, request, *args, **kwargs):
+        recorder = QueryRecorder()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = request(*args, **kwargs)
+            if getattr(response, 'streaming', False):
+                b''.join(response.streaming_content)
+        view_name = response.resolver_match.view_name
+        method = response.request['REQUEST_METHOD']
+        size = page_size(response)
+        allowed = allowed_queries(view_name, method, size)
+        self.results.append({
+            'view': view_name,
+            'method': method,
+            'page_size': size,
+            'queries': recorder.count,
+            'allowed': allowed,
+        })
+        if recorder.count > allowed:
+            raise QueryBudgetExceeded(
+                f'{method} {view_name} ran {recorder.count} queries, '
+                f'budget is {allowed} for page size {size}:\n'
+                + '\n'.join(f'{count}x {shape}' for shape, count
+                            in recorder.shapes.most_common()))
+        return response
+
+    def report(self):
+        return [
+            f'{result["method"]:6} {result["view"]:34} '
+            f'page={result["page_size"]:<4} '
+            f'{result["queries"]}/{result["allowed"]}'
+            for result in self.results]
@@ -1,12 +1,24 @@
+import json
+from operator import attrgetter
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from drf_extra_fields.fields import Base64ImageField
 from rest_framework import serializers
+from rest_framework.utils import html
 from rest_framework.validators import UniqueTogetherValidator
 
-from recipes.models import Ingredient, IngredientQuantity, Recipe, Tag
+from recipes.cart import change_recipe_ingredients
+from recipes.images import schedule_image_variants
+from recipes.pantry import recipe_ingredient_index
+from recipes.models import (Ingredient, IngredientQuantity, Recipe,
+                            ShoppingCartIngredient, Tag)
 from users.models import Subscription
 from users.serializers import UserListSerializer
 
+from .fields import ImageVariantsField, PrimaryKeyListField, RecipeImageField
+
 User = get_user_model()
 
 
@@ -37,12 +49,21 @@ class GetIngredientSerializer(serializers.ModelSerializer):
         ]
 
 
+class ShoppingCartIngredientSerializer(serializers.ModelSerializer):
+    id = serializers.ReadOnlyField(source='ingredient.id')
+    name = serializers.ReadOnlyField(source='ingredient.name')
+    measurement_unit = serializers.ReadOnlyField(
+        source='ingredient.measurement_unit')
+
+    class Meta:
+        model = ShoppingCartIngredient
+        fields = ('id', 'name', 'measurement_unit', 'amount')
+
+
 class RecipeIngredientSerializer(serializers.ModelSerializer):
     recipe = serializers.PrimaryKeyRelatedField(read_only=True)
     amount = serializers.IntegerField(write_only=True, min_value=1)
-    id = serializers.PrimaryKeyRelatedField(
-        source='ingredient',
-        queryset=Ingredient.objects.all(), )
+    id = serializers.IntegerField(source='ingredient', min_value=1)
 
     class Meta:
         model = IngredientQuantity
@@ -51,10 +72,27 @@ class RecipeIngredientSerializer(serializers.ModelSerializer):
 
 class RecipeSubscribeSerializer(serializers.ModelSerializer):
     image = Base64ImageField()
+    image_variants = ImageVariantsField()
 
     class Meta:
         model = Recipe
-        fields = ('id', 'name', 'image', 'cooking_time')
+        fields = ('id', 'name', 'image', 'image_variants', 'cooking_time')
+
+
+class RecipeIdsSerializer(serializers.Serializer):
+    recipes = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False,
+        max_length=settings.MAX_PAGE_SIZE)
+
+    def validate_recipes(self, value):
+        recipe_ids = list(dict.fromkeys(value))
+        found = set(Recipe.objects.filter(id__in=recipe_ids).values_list(
+            'id', flat=True))
+        missing = [pk for pk in recipe_ids if pk not in found]
+        if missing:
+            raise serializers.ValidationError(
+                f'Recipes do not exist: {missing}')
+        return recipe_ids
 
 
 class SubscriptionSerializer(serializers.ModelSerializer):
@@ -65,7 +103,7 @@ class SubscriptionSerializer(serializers.ModelSerializer):
     last_name = serializers.ReadOnlyField(source='author.last_name')
     is_subscribed = serializers.SerializerMethodField()
     recipes = serializers.SerializerMethodField()
-    recipes_count = serializers.ReadOnlyField(source='author.recipes.count')
+    recipes_count = serializers.ReadOnlyField(source='author.recipes_count')
 
     class Meta:
         model = Subscription
@@ -74,16 +112,18 @@ class SubscriptionSerializer(serializers.ModelSerializer):
             'is_subscribed', 'recipes', 'recipes_count')
 
     def get_is_subscribed(self, obj):
-        return Subscription.objects.filter(user=obj.user,
-                                           author=obj.author).exists()
+        return True
 
     def get_recipes(self, obj):
-        request = self.context.get('request')
-        limit = request.GET.get('recipes_limit')
-        queryset = Recipe.objects.filter(author=obj.author)
-        if limit:
-            queryset = queryset[:int(limit)]
-        return RecipeSubscribeSerializer(queryset, many=True).data
+        recipes = self.context.get('recipes')
+        if recipes is None:
+            recipes = Recipe.objects.latest_by_author([obj.author_id])
+        return RecipeSubscribeSerializer(recipes.get(obj.author_id, ()),
+                                         many=True).data
+
+
+class RecipesLimitSerializer(serializers.Serializer):
+    recipes_limit = serializers.IntegerField(min_value=0, required=False)
 
 
 class GetRecipeSerializer(serializers.ModelSerializer):
@@ -93,37 +133,45 @@ class GetRecipeSerializer(serializers.ModelSerializer):
     ingredients = serializers.SerializerMethodField()
     is_favorited = serializers.SerializerMethodField()
     image = Base64ImageField(use_url=True)
+    image_variants = ImageVariantsField()
 
     class Meta:
         model = Recipe
         fields = ('id', 'author', 'tags', 'ingredients', 'is_in_shopping_cart',
-                  'is_favorited', 'image', 'name', 'text',
+                  'is_favorited', 'image', 'image_variants', 'name', 'text',
                   'cooking_time')
 
     def get_is_favorited(self, obj):
+        if hasattr(obj, 'is_favorited'):
+            return obj.is_favorited
         user = self.context['request'].user
         if user.is_authenticated:
             return obj.favorites.filter(user=user).exists()
         return False
 
     def get_is_in_shopping_cart(self, obj):
+        if hasattr(obj, 'is_in_shopping_cart'):
+            return obj.is_in_shopping_cart
         user = self.context['request'].user
         if user.is_authenticated:
             return obj.cart.filter(user=user).exists()
         return False
 
     def get_ingredients(self, obj):
-        ingredients = IngredientQuantity.objects.filter(recipe=obj)
-        return GetIngredientSerializer(ingredients, many=True).data
+        return GetIngredientSerializer(obj.amount.all(), many=True).data
+
+    def to_representation(self, instance):
+        if hasattr(instance, 'author_is_subscribed'):
+            instance.author.is_subscribed = instance.author_is_subscribed
+        return super().to_representation(instance)
 
 
 class RecipeSerializer(serializers.ModelSerializer):
-    tags = serializers.PrimaryKeyRelatedField(queryset=Tag.objects.all(),
-                                              many=True)
+    tags = PrimaryKeyListField(queryset=Tag.objects.all())
     author = UserListSerializer(read_only=True)
     ingredients = RecipeIngredientSerializer(many=True)
     cooking_time = serializers.IntegerField(min_value=1)
-    image = Base64ImageField(use_url=True)
+    image = RecipeImageField(use_url=True)
 
     class Meta:
         model = Recipe
@@ -132,43 +180,122 @@ class RecipeSerializer(serializers.ModelSerializer):
             'cooking_time')
 
     def create_update(self, datas, model, recipe):
-        create_data = (model(recipe=recipe, ingredient=data['ingredient'],
-                             amount=data['amount']) for data in datas)
+        create_data = [model(recipe=recipe, ingredient=data['ingredient'],
+                             amount=data['amount']) for data in datas]
         model.objects.bulk_create(create_data)
+        return create_data
 
+    @transaction.atomic
     def create(self, validated_data):
         ingredients_data = validated_data.pop('ingredients')
         tags_data = validated_data.pop('tags')
         recipe = Recipe.objects.create(**validated_data)
-        recipe.tags.set(tags_data)
-        self.create_update(ingredients_data, IngredientQuantity, recipe)
+        recipe.tags.add(*tags_data)
+        recipe.ingredient_rows = self.create_update(
+            ingredients_data, IngredientQuantity, recipe)[::-1]
+        recipe.tag_list = tags_data
+        recipe_ingredient_index.schedule_refresh(recipe.id)
+        schedule_image_variants(recipe.id)
         return recipe
 
+    def update_tags(self, recipe, tags):
+        old_ids = set(recipe.tags.values_list('id', flat=True))
+        new_ids = {tag.id for tag in tags}
+        if old_ids == new_ids:
+            return False
+        recipe.tags.remove(*(old_ids - new_ids))
+        recipe.tags.add(*(new_ids - old_ids))
+        return True
+
+    def update_ingredients(self, recipe, ingredients_data):
+        rows = {row.ingredient_id: row for row in
+                IngredientQuantity.objects.filter(recipe=recipe)}
+        old_amounts = {pk: row.amount for pk, row in rows.items()}
+        new_amounts = {data['ingredient'].id: data['amount']
+                       for data in ingredients_data}
+        if old_amounts == new_amounts:
+            return False
+        IngredientQuantity.objects.filter(id__in=[
+            row.id for pk, row in rows.items()
+            if pk not in new_amounts]).delete()
+        changed = []
+        for pk, row in rows.items():
+            if pk in new_amounts and row.amount != new_amounts[pk]:
+                row.amount = new_amounts[pk]
+                changed.append(row)
+        IngredientQuantity.objects.bulk_update(changed, ('amount',))
+        IngredientQuantity.objects.bulk_create(
+            IngredientQuantity(recipe=recipe, ingredient_id=pk, amount=amount)
+            for pk, amount in new_amounts.items() if pk not in rows)
+        change_recipe_ingredients(recipe.id, old_amounts, new_amounts)
+        recipe_ingredient_index.schedule_refresh(recipe.id)
+        return True
+
+    @transaction.atomic
     def update(self, instance, validated_data):
-        if 'tags' in self.validated_data:
-            tags_data = validated_data.pop('tags')
-            instance.tags.set(tags_data)
-        if 'ingredients' in self.validated_data:
-            ingredients_data = validated_data.pop('ingredients')
-            quantity = IngredientQuantity.objects.filter(
-                recipe_id=instance.id)
-            quantity.delete()
-            self.create_update(ingredients_data, IngredientQuantity, instance)
+        changed = False
+        if 'tags' in validated_data:
+            instance.tag_list = validated_data.pop('tags')
+            changed |= self.update_tags(instance, instance.tag_list)
+        if 'ingredients' in validated_data:
+            changed |= self.update_ingredients(
+                instance, validated_data.pop('ingredients'))
+        if 'image' in validated_data:
+            validated_data['image_variants'] = {}
+            schedule_image_variants(instance.id)
+        elif not changed and all(
+                getattr(instance, field) == value
+                for field, value in validated_data.items()):
+            return instance
         return super().update(instance, validated_data)
 
     def to_representation(self, instance):
         self.fields.pop('ingredients')
         self.fields.pop('tags')
+        if instance.author_id == self.context['request'].user.id:
+            instance.author.is_subscribed = False
         represent = super().to_representation(instance)
+        if hasattr(instance, 'ingredient_rows'):
+            rows = instance.ingredient_rows
+        else:
+            rows = IngredientQuantity.objects.filter(
+                recipe=instance).select_related('ingredient')
         represent['ingredients'] = GetIngredientSerializer(
-            IngredientQuantity.objects.filter(recipe=instance),
-            many=True).data
-        represent['tags'] = TagSerializer(instance.tags, many=True).data
+            rows, many=True).data
+        if hasattr(instance, 'tag_list'):
+            tags = sorted(instance.tag_list, key=attrgetter('name'))
+        else:
+            tags = instance.tags.all()
+        represent['tags'] = TagSerializer(tags, many=True).data
         return represent
 
+    def to_internal_value(self, data):
+        if html.is_html_input(data):
+            data = {key: data.getlist(key) if key == 'tags' else data[key]
+                    for key in data}
+            if isinstance(data.get('ingredients'), str):
+                try:
+                    data['ingredients'] = json.loads(data['ingredients'])
+                except ValueError:
+                    raise serializers.ValidationError(
+                        {'ingredients': ['Expected a JSON list']})
+        return super().to_internal_value(data)
+
+    def validate_ingredients(self, value):
+        ingredients = Ingredient.objects.in_bulk(
+            {data['ingredient'] for data in value})
+        missing = sorted({data['ingredient'] for data in value}
+                         - ingredients.keys())
+        if missing:
+            raise serializers.ValidationError(
+                f'Ingredients do not exist: {missing}')
+        for data in value:
+            data['ingredient'] = ingredients[data['ingredient']]
+        return value
+
     def validate(self, data):
-        ingredients = self.initial_data.get('ingredients')
-        ingredients_list = [ingredient['id'] for ingredient in ingredients]
+        ingredients_list = [ingredient['ingredient']
+                            for ingredient in data.get('ingredients', [])]
         if len(ingredients_list) != len(set(ingredients_list)):
             raise serializers.ValidationError(
                 'Which ingredient is listed more than once')
@@ -0,0 +1,78 @@
+import base64
+import binascii
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+
+from recipes.models import RecipeDeletion
+
+
+def encode_cursor(updated_at, recipe_id, deleted_at, deletion_id):
+    data = json.dumps({
+        'u': updated_at.isoformat() if updated_at else None,
+        'r': recipe_id,
+        't': deleted_at.isoformat() if deleted_at else None,
+        'd': deletion_id,
+    })
+    return base64.urlsafe_b64encode(data.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        updated_at = data['u'] and parse_datetime(data['u'])
+        deleted_at = data['t'] and parse_datetime(data['t'])
+        return updated_at, int(data['r']), deleted_at, int(data['d'])
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise ValidationError({'cursor': 'Invalid cursor'})
+
+
+def after(queryset, field, value, pk):
+    if value is None:
+        return queryset.filter(id__gt=pk)
+    return queryset.filter(Q(**{f'{field}__gt': value})
+                           | Q(**{field: value, 'id__gt': pk}))
+
+
+def sync_limit(value):
+    try:
+        return max(1, min(int(value), settings.MAX_PAGE_SIZE))
+    except (TypeError, ValueError):
+        return settings.MAX_PAGE_SIZE
+
+
+def recipe_changes(queryset, cursor, limit):
+    horizon = timezone.now() - timedelta(seconds=settings.SYNC_SAFETY_MARGIN)
+    deletions = RecipeDeletion.objects.filter(
+        deleted_at__lte=horizon).order_by('deleted_at', 'id')
+    if cursor:
+        updated_at, recipe_id, deleted_at, deletion_id = decode_cursor(cursor)
+        deleted = list(after(deletions, 'deleted_at', deleted_at,
+                             deletion_id).values_list(
+            'deleted_at', 'id', 'recipe_id')[:limit + 1])
+    else:
+        updated_at, recipe_id, deleted = None, 0, []
+        deleted_at, deletion_id = deletions.reverse().values_list(
+            'deleted_at', 'id').first() or (None, 0)
+    queryset = queryset.filter(updated_at__lte=horizon)
+    if updated_at is not None:
+        queryset = after(queryset, 'updated_at', updated_at, recipe_id)
+    recipes = list(queryset.order_by('updated_at', 'id')[:limit + 1])
+    has_more = len(recipes) > limit or len(deleted) > limit
+    recipes, deleted = recipes[:limit], deleted[:limit]
+    if recipes:
+        updated_at, recipe_id = recipes[-1].updated_at, recipes[-1].id
+    if deleted:
+        deleted_at, deletion_id = deleted[-1][:2]
+    return {
+        'recipes': recipes,
+        'deleted': [pk for _, _, pk in deleted],
+        'cursor': encode_cursor(updated_at, recipe_id, deleted_at,
+                                deletion_id),
+        'has_more': has_more,
+    }
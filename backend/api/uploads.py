@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class RequestTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = 'Upload is too large.'
+    default_code = 'request_too_large'
+
+
+def check_upload_size(size):
+    if size > settings.RECIPE_MAX_UPLOAD_SIZE:
+        raise RequestTooLarge(
+            f'Upload is larger than {settings.RECIPE_MAX_UPLOAD_SIZE} bytes.')
+
+
+class LimitedTemporaryFileUploadHandler(TemporaryFileUploadHandler):
+    def handle_raw_input(self, input_data, meta, content_length, boundary,
+                         encoding=None):
+        check_upload_size(content_length)
+
+    def receive_data_chunk(self, raw_data, start):
+        check_upload_size(start + len(raw_data))
+        return super().receive_data_chunk(raw_data, start)
@@ -1,55 +1,163 @@
-from django.db.models import Sum
-from django.http import HttpResponse
-from django.utils import timezone
+from calendar import timegm
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db import transaction
+from django.db.models import F
+from django.http import StreamingHttpResponse
+from django.utils.cache import (get_conditional_response, patch_cache_control,
+                                patch_vary_headers)
+from django.utils.decorators import method_decorator
+from django.utils.http import http_date
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.generics import get_object_or_404
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 
-from recipes.models import (Favorite, Ingredient, IngredientQuantity, Recipe,
-                            ShoppingCart, Tag)
+from recipes.cart import change_recipe_in_cart, change_recipes_in_cart
+from recipes.db import change_counter, insert_ignore, insert_ignore_returning
+from recipes.models import (Favorite, Ingredient, Recipe, ShoppingCart,
+                            ShoppingCartIngredient, Tag)
+from recipes.search import ingredient_index
 
-from .filters import IngredientsFilter, RecipesFilter
+from .cache import (cached_data, catalog_etag, detail_cache_key,
+                    list_cache_key, overlay_user_flags, recipe_documents,
+                    recipe_etag)
+from .exports import SHOPPING_LIST_EXPORTS
+from .filters import IngredientsFilter, RecipeOrderingFilter, RecipesFilter
 from .mixins import ViewSetMixin
-from .pagination import CustomPagination
+from .pagination import RecipePagination
 from .permissions import IsAuthorOrReadOnly
+from .renderers import CSVRenderer, PlainTextRenderer
 from .serializers import (GetRecipeSerializer, IngredientSerializer,
-                          RecipeSerializer, RecipeSubscribeSerializer,
-                          TagSerializer)
+                          RecipeIdsSerializer, RecipeSerializer,
+                          RecipeSubscribeSerializer,
+                          ShoppingCartIngredientSerializer, TagSerializer)
+from .sync import recipe_changes, sync_limit
+from .uploads import LimitedTemporaryFileUploadHandler, check_upload_size
+
+COUNTER_FIELDS = {
+    Favorite: 'favorites_count',
+    ShoppingCart: 'cart_count',
+}
+
 
+catalog_conditional = method_decorator((
+    cache_control(public=True, max_age=settings.CATALOG_CACHE_MAX_AGE),
+    condition(etag_func=catalog_etag),
+), name='dispatch')
 
+
+@catalog_conditional
 class TagViewSet(ViewSetMixin):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     permission_classes = (permissions.AllowAny,)
 
 
+@catalog_conditional
 class IngredientViewSet(ViewSetMixin):
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     filterset_class = IngredientsFilter
     permission_classes = (permissions.AllowAny,)
 
+    def list(self, request, *args, **kwargs):
+        name = request.query_params.get('name')
+        if not name:
+            return super().list(request, *args, **kwargs)
+        return Response(ingredient_index.search(
+            name, request.query_params.get('measurement_unit')))
+
 
 class RecipeViewSet(viewsets.ModelViewSet):
     queryset = Recipe.objects.all()
-    pagination_class = CustomPagination
+    lookup_value_regex = r'\d+'
+    pagination_class = RecipePagination
     filterset_class = RecipesFilter
-    filter_backends = (DjangoFilterBackend,)
+    filter_backends = (DjangoFilterBackend, RecipeOrderingFilter)
+    ordering_fields = ('id', 'pub_date', 'favorites_count', 'cart_count')
+    ordering = ('-id',)
+
+    def initialize_request(self, request, *args, **kwargs):
+        request.upload_handlers = [LimitedTemporaryFileUploadHandler(request)]
+        return super().initialize_request(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in ('POST', 'PUT', 'PATCH'):
+            check_upload_size(int(request.META.get('CONTENT_LENGTH') or 0))
 
     def get_queryset(self):
+        queryset = Recipe.objects.with_user_flags(self.request.user)
+        if self.action in ('list', 'retrieve'):
+            queryset = queryset.only('id', 'author', 'updated_at')
+        else:
+            queryset = queryset.with_related()
         is_favorited = self.request.query_params.get('is_favorited')
         is_in_shopping_cart = self.request.query_params.get(
             'is_in_shopping_cart')
         if is_favorited is not None and int(is_favorited) == 1:
-            return Recipe.objects.filter(favorites__user=self.request.user)
+            return queryset.filter(is_favorited=True)
         if is_in_shopping_cart is not None and int(is_in_shopping_cart) == 1:
-            return Recipe.objects.filter(cart__user=self.request.user)
-        return Recipe.objects.all()
+            return queryset.filter(is_in_shopping_cart=True)
+        return queryset
+
+    def cached_response(self, key, build):
+        data, status_name = cached_data(key, build)
+        response = Response(data)
+        if status_name is not None:
+            response['X-Cache'] = status_name
+        return response
+
+    def build_documents(self, recipe_ids):
+        queryset = Recipe.objects.with_related().with_user_flags(
+            AnonymousUser()).filter(id__in=recipe_ids)
+        serializer = GetRecipeSerializer(queryset, many=True)
+        return {document['id']: document for document in serializer.data}
+
+    def recipe_data(self, recipes):
+        documents = recipe_documents([recipe.id for recipe in recipes],
+                                     self.build_documents)
+        return [overlay_user_flags(documents[recipe.id], recipe, self.request)
+                for recipe in recipes]
+
+    def list_data(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return self.recipe_data(list(queryset))
+        return self.get_paginated_response(self.recipe_data(page)).data
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(list_cache_key(request), self.list_data)
+
+    def retrieve(self, request, *args, **kwargs):
+        recipe = self.get_object()
+        etag = recipe_etag(recipe)
+        last_modified = timegm(recipe.updated_at.utctimetuple())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = self.cached_response(
+                detail_cache_key(request, recipe.id),
+                lambda: self.recipe_data([recipe])[0])
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        if request.user.is_authenticated:
+            patch_cache_control(response, private=True, no_cache=True)
+        else:
+            patch_cache_control(response, public=True, no_cache=True)
+        patch_vary_headers(response, ('Authorization',))
+        return response
 
     def get_permissions(self):
-        if self.action != 'create':
+        if self.action in ('list', 'retrieve', 'update', 'partial_update',
+                           'destroy'):
             return (IsAuthorOrReadOnly(),)
         return super().get_permissions()
 
@@ -66,66 +174,118 @@ class RecipeViewSet(viewsets.ModelViewSet):
         return Response({"message": "You deleted the recipe"},
                         status=status.HTTP_204_NO_CONTENT)
 
+    @action(detail=False, permission_classes=(permissions.AllowAny,))
+    def changes(self, request):
+        changes = recipe_changes(
+            Recipe.objects.with_user_flags(request.user).only(
+                'id', 'author', 'updated_at'),
+            request.query_params.get('cursor'),
+            sync_limit(request.query_params.get('limit')))
+        changes['recipes'] = self.recipe_data(changes['recipes'])
+        return Response(changes)
+
+    @transaction.atomic
     def post_delete(self, request, pk, model, serializer):
         if self.request.method == 'POST':
             recipe = get_object_or_404(Recipe, pk=pk)
-            if model.objects.filter(user=request.user,
-                                    recipe=recipe).exists():
+            if not insert_ignore([model(user=request.user, recipe=recipe)]):
                 return Response(
                     {"message": "Recipe already in favorites/Shopping List"},
                     status=status.HTTP_400_BAD_REQUEST)
-            model.objects.get_or_create(user=request.user, recipe=recipe)
+            change_counter(Recipe.objects.filter(pk=recipe.pk),
+                           COUNTER_FIELDS[model], 1)
+            if model is ShoppingCart:
+                change_recipe_in_cart(request.user.id, recipe.id, 1)
             return Response(serializer(recipe).data,
                             status=status.HTTP_201_CREATED)
         if self.request.method == 'DELETE':
-            recipe = get_object_or_404(Recipe, pk=pk)
-            if model.objects.filter(user=request.user,
-                                    recipe=recipe).exists():
-                data = get_object_or_404(model, user=request.user,
-                                         recipe=recipe)
-                data.delete()
+            deleted, _ = model.objects.filter(user=request.user,
+                                              recipe_id=pk).delete()
+            if deleted:
+                change_counter(Recipe.objects.filter(pk=pk),
+                               COUNTER_FIELDS[model], -deleted)
+                if model is ShoppingCart:
+                    change_recipe_in_cart(request.user.id, pk, -1)
                 return Response({"message": "Recipe/Cart removed"},
                                 status=status.HTTP_204_NO_CONTENT)
+            get_object_or_404(Recipe, pk=pk)
             return Response(
                 {"message": "Recipe not in favorites/Shopping List"},
                 status=status.HTTP_400_BAD_REQUEST)
         return 'Request method not in ["POST", "DELETE"]'
 
+    @transaction.atomic
+    def bulk_post_delete(self, request, model):
+        serializer = RecipeIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        recipe_ids = serializer.validated_data['recipes']
+        if request.method == 'POST':
+            affected = set(insert_ignore_returning(
+                [model(user=request.user, recipe_id=pk) for pk in recipe_ids],
+                'recipe_id'))
+            sign, key, code = 1, 'added', status.HTTP_201_CREATED
+        else:
+            affected = set(model.objects.select_for_update().filter(
+                user=request.user, recipe_id__in=recipe_ids).values_list(
+                'recipe_id', flat=True))
+            model.objects.filter(user=request.user,
+                                 recipe_id__in=affected).delete()
+            sign, key, code = -1, 'removed', status.HTTP_200_OK
+        changed = [pk for pk in recipe_ids if pk in affected]
+        change_counter(Recipe.objects.filter(pk__in=changed),
+                       COUNTER_FIELDS[model], sign)
+        if model is ShoppingCart:
+            change_recipes_in_cart(request.user.id, changed, sign)
+        return Response(
+            {key: changed,
+             'skipped': [pk for pk in recipe_ids if pk not in changed]},
+            status=code)
+
     @action(detail=True, methods=['POST', 'DELETE'])
     def favorite(self, request, pk):
         model = Favorite
         serializer = RecipeSubscribeSerializer
         return self.post_delete(request, pk, model, serializer)
 
+    @action(detail=False, methods=['POST', 'DELETE'], url_path='favorite',
+            url_name='favorite-bulk')
+    def favorite_bulk(self, request):
+        return self.bulk_post_delete(request, Favorite)
+
     @action(detail=True, methods=['POST', 'DELETE'])
     def shopping_cart(self, request, pk):
         model = ShoppingCart
         serializer = RecipeSubscribeSerializer
         return self.post_delete(request, pk, model, serializer)
 
+    @action(detail=False, methods=['POST', 'DELETE'],
+            url_path='shopping_cart', url_name='shopping-cart-bulk')
+    def shopping_cart_bulk(self, request):
+        return self.bulk_post_delete(request, ShoppingCart)
+
     @action(detail=False, methods=('GET',),
-            permission_classes=[permissions.IsAuthenticated, ])
+            permission_classes=[permissions.IsAuthenticated, ],
+            renderer_classes=(PlainTextRenderer, CSVRenderer, JSONRenderer))
     def download_shopping_cart(self, request):
         user = request.user
-        filename = f'{user.username}_shopping_list.txt'
-        now = timezone.now()
-        shopping_list = [
-            f'Список покупок для пользователя: {user.username}\n\n'
-            f'Дата: {now:%Y-%m-%d}\n\n'
-        ]
-        ingredients = IngredientQuantity.objects.filter(
-            recipe__cart__user=user).values('ingredient__name',
-                                            'ingredient__measurement_unit'
-                                            ).annotate(
-            ingredient_amount=Sum('amount'))
-
-        for ing in ingredients:
-            shopping_list.append(
-                f'{ing["ingredient__name"]}: {ing["ingredient_amount"]} '
-                f'{ing["ingredient__measurement_unit"]}'
-            )
-        response = HttpResponse(
-            shopping_list, content_type='text.txt; charset=utf-8'
+        renderer = request.accepted_renderer
+        filename = f'{user.username}_shopping_list.{renderer.format}'
+        ingredients = ShoppingCartIngredient.objects.filter(
+            user=user).values('ingredient__name',
+                              'ingredient__measurement_unit',
+                              ingredient_amount=F('amount'))
+        response = StreamingHttpResponse(
+            SHOPPING_LIST_EXPORTS[renderer.format](user,
+                                                   ingredients.iterator()),
+            content_type=f'{renderer.media_type}; charset=utf-8'
         )
         response['Content-Disposition'] = f'attachment; filename={filename}'
         return response
+
+    @action(detail=False, methods=('GET',),
+            permission_classes=[permissions.IsAuthenticated, ])
+    def shopping_cart_summary(self, request):
+        ingredients = ShoppingCartIngredient.objects.filter(
+            user=request.user).select_related('ingredient')
+        return Response(
+            ShoppingCartIngredientSerializer(ingredients, many=True).data)
@@ -0,0 +1,39 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+replica = ContextVar('replica', default=None)
+
+
+@contextmanager
+def reading_from(alias):
+    token = replica.set(alias)
+    try:
+        yield
+    finally:
+        replica.reset(token)
+
+
+def reading_from_replicas():
+    return reading_from(random.choice(settings.DATABASE_REPLICAS)
+                        if settings.DATABASE_REPLICAS else None)
+
+
+def primary():
+    return reading_from(None)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return replica.get() or 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
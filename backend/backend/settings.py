@@ -12,7 +12,19 @@ SECRET_KEY = (os.getenv('SECRET_KEY',
 
 PAGE_SIZE = 6
 
-DEBUG = True
+MAX_PAGE_SIZE = int(os.getenv('MAX_PAGE_SIZE', default=100))
+
+INGREDIENT_INDEX_TTL = int(os.getenv('INGREDIENT_INDEX_TTL', default=300))
+
+INGREDIENT_SEARCH_LIMIT = int(
+    os.getenv('INGREDIENT_SEARCH_LIMIT', default=30))
+
+RECIPE_INGREDIENT_INDEX_TTL = int(
+    os.getenv('RECIPE_INGREDIENT_INDEX_TTL', default=300))
+
+SEARCH_CONFIG = os.getenv('SEARCH_CONFIG', default='russian')
+
+DEBUG = os.getenv('DEBUG', default='True') == 'True'
 
 ALLOWED_HOSTS = ['158.160.39.177',
                  '127.0.0.1',
@@ -38,6 +50,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.QueryInstrumentationMiddleware',
+    'api.middleware.ReplicaPinMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -47,6 +61,13 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+SQL_INSTRUMENTATION_SAMPLE_RATE = float(
+    os.getenv('SQL_INSTRUMENTATION_SAMPLE_RATE', default=0.1))
+SQL_SLOW_REQUEST_MS = float(os.getenv('SQL_SLOW_REQUEST_MS', default=200))
+SQL_SLOWEST_QUERIES = int(os.getenv('SQL_SLOWEST_QUERIES', default=3))
+SQL_REPEATED_QUERY_THRESHOLD = int(
+    os.getenv('SQL_REPEATED_QUERY_THRESHOLD', default=5))
+
 ROOT_URLCONF = 'backend.urls'
 
 TEMPLATES = [
@@ -79,6 +100,37 @@ DATABASES = {
     }
 }
 
+DATABASE_REPLICAS = []
+for number, replica in enumerate(
+        filter(None, os.getenv('DB_REPLICAS', default='').split(','))):
+    DATABASE_REPLICAS.append(f'replica_{number}')
+    DATABASES[f'replica_{number}'] = dict(
+        DATABASES['default'], TEST={'MIRROR': 'default'},
+        **{'NAME' if 'sqlite' in DATABASES['default']['ENGINE']
+           else 'HOST': replica.strip()})
+
+DATABASE_ROUTERS = ['backend.routers.ReplicaRouter']
+
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', default=5))
+
+# Cached recipe responses are invalidated by version keys in this cache, so
+# every worker must share it. LocMem is only fit for DEBUG and tests; with
+# DEBUG off the api.E001 system check refuses to start on it.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', default='foodgram'),
+    }
+}
+
+RECIPE_CACHE_TIMEOUT = int(os.getenv('RECIPE_CACHE_TIMEOUT', default=300))
+
+CATALOG_CACHE_MAX_AGE = int(os.getenv('CATALOG_CACHE_MAX_AGE', default=60))
+
+SYNC_SAFETY_MARGIN = int(os.getenv('SYNC_SAFETY_MARGIN', default=10))
+
 # DATABASES = {
 #     'default': {
 #         'ENGINE': 'django.db.backends.sqlite3',
@@ -117,13 +169,25 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'static')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+RECIPE_MAX_UPLOAD_SIZE = int(os.getenv('RECIPE_MAX_UPLOAD_SIZE',
+                                       default=10 * 1024 * 1024))
+
+IMAGE_PROCESSING_ASYNC = os.getenv('IMAGE_PROCESSING_ASYNC',
+                                   default='True') == 'True'
+IMAGE_WORKERS = int(os.getenv('IMAGE_WORKERS', default=2))
+IMAGE_QUALITY = 80
+IMAGE_VARIANT_WIDTHS = {
+    'small': 320,
+    'medium': 640,
+}
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'users.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication'
+        'api.authentication.CachedTokenAuthentication'
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -133,6 +197,13 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Without TOKEN_CACHE_SHARED each worker keeps its own token cache, so a
+# logout or deactivation reaches other workers only after TOKEN_CACHE_TTL.
+# With it, all workers read the shared cache and revocation is immediate.
+TOKEN_CACHE_SIZE = int(os.getenv('TOKEN_CACHE_SIZE', default=10000))
+TOKEN_CACHE_TTL = int(os.getenv('TOKEN_CACHE_TTL', default=60))
+TOKEN_CACHE_SHARED = os.getenv('TOKEN_CACHE_SHARED', default='False') == 'True'
+
 DJOSER = {
     'HIDE_USERS': False,
     'PERMISSIONS': {
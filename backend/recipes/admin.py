@@ -1,7 +1,7 @@
 from django.contrib import admin
 
 from .models import (Favorite, Ingredient, IngredientQuantity, Recipe,
-                     ShoppingCart, Tag)
+                     RecipeDeletion, ShoppingCart, ShoppingCartIngredient, Tag)
 
 
 class TagAdmin(admin.ModelAdmin):
@@ -27,7 +27,7 @@ class RecipeAdmin(admin.ModelAdmin):
     empty_value_display = '-пусто-'
 
     def count_favor(self, obj):
-        return obj.favorites.count()
+        return obj.favorites_count
 
 
 class ShoppingCartAdmin(admin.ModelAdmin):
@@ -51,9 +51,25 @@ class IngredientQuantityAdmin(admin.ModelAdmin):
     empty_value_display = '-пусто-'
 
 
+class ShoppingCartIngredientAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'ingredient', 'amount')
+    search_fields = ('user', 'ingredient')
+    list_filter = ('user',)
+    empty_value_display = '-пусто-'
+
+
+class RecipeDeletionAdmin(admin.ModelAdmin):
+    list_display = ('id', 'recipe_id', 'author_id', 'deleted_at')
+    search_fields = ('recipe_id',)
+    list_filter = ('deleted_at',)
+    empty_value_display = '-пусто-'
+
+
 admin.site.register(Tag, TagAdmin)
 admin.site.register(Ingredient, IngredientAdmin)
 admin.site.register(Recipe, RecipeAdmin)
 admin.site.register(ShoppingCart, ShoppingCartAdmin)
 admin.site.register(Favorite, FavoriteAdmin)
 admin.site.register(IngredientQuantity, IngredientQuantityAdmin)
+admin.site.register(ShoppingCartIngredient, ShoppingCartIngredientAdmin)
+admin.site.register(RecipeDeletion, RecipeDeletionAdmin)
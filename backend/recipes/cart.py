@@ -0,0 +1,82 @@
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Sum, Value, When
+from django.db.models.functions import Greatest
+
+from .models import IngredientQuantity, ShoppingCart, ShoppingCartIngredient
+
+CART_DELTA_BATCH_SIZE = 500
+
+
+def apply_cart_deltas(deltas):
+    deltas = [(key, delta) for key, delta in deltas.items() if delta]
+    if not deltas:
+        return
+    with transaction.atomic():
+        for start in range(0, len(deltas), CART_DELTA_BATCH_SIZE):
+            apply_cart_batch(deltas[start:start + CART_DELTA_BATCH_SIZE])
+
+
+def apply_cart_batch(deltas):
+    ShoppingCartIngredient.objects.bulk_create((
+        ShoppingCartIngredient(user_id=user_id, ingredient_id=ingredient_id,
+                               amount=0)
+        for (user_id, ingredient_id), delta in deltas if delta > 0),
+        ignore_conflicts=True)
+    rows = ShoppingCartIngredient.objects.filter(
+        user_id__in={user_id for (user_id, _), _ in deltas},
+        ingredient_id__in={ingredient_id for (_, ingredient_id), _ in deltas})
+    rows.update(amount=Greatest(F('amount') + Case(
+        *(When(user_id=user_id, ingredient_id=ingredient_id,
+               then=Value(delta))
+          for (user_id, ingredient_id), delta in deltas),
+        default=Value(0), output_field=IntegerField()), 0))
+    if min(delta for _, delta in deltas) < 0:
+        rows.filter(amount=0).delete()
+
+
+def recipe_amounts(recipe_id):
+    return dict(IngredientQuantity.objects.filter(
+        recipe_id=recipe_id).values_list('ingredient_id', 'amount'))
+
+
+def change_recipes_in_cart(user_id, recipe_ids, sign):
+    deltas = {}
+    for ingredient_id, amount in IngredientQuantity.objects.filter(
+            recipe_id__in=recipe_ids).values_list('ingredient_id', 'amount'):
+        deltas[(user_id, ingredient_id)] = (
+            deltas.get((user_id, ingredient_id), 0) + sign * amount)
+    apply_cart_deltas(deltas)
+
+
+def change_recipe_in_cart(user_id, recipe_id, sign):
+    change_recipes_in_cart(user_id, [recipe_id], sign)
+
+
+def change_recipe_ingredients(recipe_id, old_amounts, new_amounts):
+    user_ids = ShoppingCart.objects.filter(
+        recipe_id=recipe_id).values_list('user_id', flat=True)
+    deltas = {}
+    for user_id in user_ids:
+        for ingredient_id in old_amounts.keys() | new_amounts.keys():
+            deltas[(user_id, ingredient_id)] = (
+                new_amounts.get(ingredient_id, 0)
+                - old_amounts.get(ingredient_id, 0))
+    apply_cart_deltas(deltas)
+
+
+def remove_recipe_from_carts(recipe_id):
+    change_recipe_ingredients(recipe_id, recipe_amounts(recipe_id), {})
+
+
+def live_cart_totals(user_ids=None):
+    if user_ids is None:
+        queryset = IngredientQuantity.objects.filter(
+            recipe__cart__isnull=False)
+    else:
+        queryset = IngredientQuantity.objects.filter(
+            recipe__cart__user__in=user_ids)
+    return {
+        (row['recipe__cart__user'], row['ingredient']): row['total']
+        for row in queryset.values('recipe__cart__user', 'ingredient')
+        .annotate(total=Sum('amount')).order_by()
+    }
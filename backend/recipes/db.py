@@ -0,0 +1,58 @@
+from django.db import connections, router
+from django.db.models import Count, F, OuterRef, Subquery, sql
+from django.db.models.functions import Coalesce
+
+
+def insert_query(model, objs):
+    query = sql.InsertQuery(model, ignore_conflicts=True)
+    query.insert_values([field for field in model._meta.concrete_fields
+                         if not field.primary_key], objs)
+    return query
+
+
+def insert_ignore(objs):
+    if not objs:
+        return 0
+    model = type(objs[0])
+    using = router.db_for_write(model)
+    inserted = 0
+    with connections[using].cursor() as cursor:
+        for statement, params in insert_query(model, objs).get_compiler(
+                using=using).as_sql():
+            cursor.execute(statement, params)
+            inserted += cursor.rowcount
+    return inserted
+
+
+def can_return_rows(connection):
+    return (connection.features.can_return_rows_from_bulk_insert
+            or connection.vendor == 'sqlite'
+            and connection.Database.sqlite_version_info >= (3, 35))
+
+
+def insert_ignore_returning(objs, field):
+    if not objs:
+        return []
+    model = type(objs[0])
+    using = router.db_for_write(model)
+    connection = connections[using]
+    if not can_return_rows(connection):
+        return [getattr(obj, field) for obj in objs if insert_ignore([obj])]
+    (statement, params), = insert_query(model, objs).get_compiler(
+        using=using).as_sql()
+    column = connection.ops.quote_name(model._meta.get_field(field).column)
+    with connection.cursor() as cursor:
+        cursor.execute(f'{statement} RETURNING {column}', params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def change_counter(queryset, field, delta):
+    if delta < 0:
+        queryset = queryset.filter(**{f'{field}__gte': -delta})
+    return queryset.update(**{field: F(field) + delta})
+
+
+def count_of(model, field):
+    return Coalesce(Subquery(
+        model.objects.filter(**{field: OuterRef('pk')}).order_by().values(
+            field).annotate(total=Count('pk')).values('total')), 0)
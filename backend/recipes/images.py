@@ -0,0 +1,70 @@
+import io
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from django.utils import timezone
+from PIL import Image
+
+from .models import Recipe
+from .storage import recipe_image_storage
+from .versions import RECIPES, author_key, bump, recipe_key
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {'jpeg': ('JPEG', '.jpg'), 'webp': ('WEBP', '.webp')}
+
+executor = ThreadPoolExecutor(max_workers=settings.IMAGE_WORKERS,
+                              thread_name_prefix='recipe-images')
+
+
+def render_variant(image, width, image_format):
+    variant = image.copy()
+    variant.thumbnail((width, width * 4))
+    if image_format == 'JPEG' and variant.mode not in ('RGB', 'L'):
+        variant = variant.convert('RGB')
+    buffer = io.BytesIO()
+    variant.save(buffer, image_format, quality=settings.IMAGE_QUALITY)
+    return ContentFile(buffer.getvalue())
+
+
+def build_image_variants(recipe_id):
+    recipe = Recipe.objects.filter(pk=recipe_id).only(
+        'image', 'author').first()
+    if recipe is None or not recipe.image:
+        return {}
+    original = recipe.image.name
+    directory = os.path.join(Recipe.image.field.upload_to, 'variants')
+    variants = {}
+    with recipe.image.open('rb') as file, Image.open(file) as image:
+        image.load()
+        for size, width in settings.IMAGE_VARIANT_WIDTHS.items():
+            for format_name, (image_format, extension) in FORMATS.items():
+                variants[f'{size}_{format_name}'] = recipe_image_storage.save(
+                    os.path.join(directory, f'{size}{extension}'),
+                    render_variant(image, width, image_format))
+    updated = Recipe.objects.filter(pk=recipe_id, image=original).update(
+        image_variants=variants, updated_at=timezone.now())
+    if updated:
+        bump(RECIPES, author_key(recipe.author_id), recipe_key(recipe_id))
+    return variants
+
+
+def run_image_variants(recipe_id):
+    try:
+        build_image_variants(recipe_id)
+    except Exception:
+        logger.exception('Image variants failed for recipe %s', recipe_id)
+    finally:
+        connection.close()
+
+
+def schedule_image_variants(recipe_id):
+    if settings.IMAGE_PROCESSING_ASYNC:
+        transaction.on_commit(
+            lambda: executor.submit(run_image_variants, recipe_id))
+    else:
+        transaction.on_commit(lambda: build_image_variants(recipe_id))
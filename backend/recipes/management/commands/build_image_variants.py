@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from recipes.images import build_image_variants
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = '''Создание уменьшенных копий картинок рецептов.'''
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help='Пересоздать копии для всех рецептов.')
+
+    def handle(self, *args, **options):
+        recipes = Recipe.objects.exclude(image='')
+        if not options['all']:
+            recipes = recipes.filter(image_variants={})
+        for recipe_id in recipes.values_list('id', flat=True).iterator():
+            try:
+                build_image_variants(recipe_id)
+            except (OSError, ValueError) as error:
+                self.stderr.write(f'Recipe {recipe_id}: {error}')
+            else:
+                self.stdout.write(f'Recipe {recipe_id}: done')
@@ -0,0 +1,171 @@
+import io
+import random
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from PIL import Image
+
+from recipes.models import (Favorite, Ingredient, IngredientQuantity, Recipe,
+                            ShoppingCart, Tag)
+from recipes.search import index_recipes
+from recipes.storage import recipe_image_storage
+from recipes.versions import RECIPES, bump, bump_catalog
+from users.models import Subscription
+
+User = get_user_model()
+
+TAGS = (
+    ('Завтрак', '#E26C2D', 'breakfast'),
+    ('Обед', '#49B64E', 'lunch'),
+    ('Ужин', '#8775D2', 'dinner'),
+)
+WORDS = ('быстрый', 'домашний', 'сырный', 'овощной', 'пряный', 'лёгкий',
+         'праздничный', 'острый', 'сливочный', 'томатный')
+DISHES = ('суп', 'салат', 'пирог', 'омлет', 'рагу', 'паста', 'запеканка',
+          'каша', 'соус', 'плов')
+
+
+def zipf_cum_weights(size, skew):
+    return list(accumulate(1 / rank ** skew for rank in range(1, size + 1)))
+
+
+class Command(BaseCommand):
+    help = '''Генерация синтетических пользователей, рецептов, избранного,
+    списков покупок и подписок для нагрузочного тестирования.'''
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--recipes', type=int, default=1000)
+        parser.add_argument('--favorites', type=int, default=20,
+                            help='Среднее число избранных на пользователя.')
+        parser.add_argument('--cart', type=int, default=5,
+                            help='Среднее число рецептов в корзине.')
+        parser.add_argument('--subscriptions', type=int, default=5,
+                            help='Среднее число подписок на пользователя.')
+        parser.add_argument('--skew', type=float, default=1.1,
+                            help='Показатель распределения Ципфа.')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--prefix', default='bench')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if User.objects.filter(
+                username__startswith=f'{options["prefix"]}_').exists():
+            raise CommandError(
+                f'Dataset with prefix "{options["prefix"]}" already exists')
+        self.random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.skew = options['skew']
+        with transaction.atomic():
+            tags = self.create_tags()
+            ingredients = list(Ingredient.objects.values_list(
+                'id', flat=True))
+            if not ingredients:
+                raise CommandError('Load ingredients first: load_data_json')
+            users = self.create_users(options['users'], options['prefix'])
+            recipes = self.create_recipes(options['recipes'], users, tags,
+                                          ingredients)
+            self.create_relations(Favorite, users, recipes,
+                                  options['favorites'])
+            self.create_relations(ShoppingCart, users, recipes,
+                                  options['cart'])
+            self.create_subscriptions(users, options['subscriptions'])
+            call_command('reconcile_counters', stdout=io.StringIO())
+            call_command('rebuild_cart_totals', stdout=io.StringIO())
+        bump_catalog()
+        bump(RECIPES)
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {len(users)} users and {len(recipes)} recipes'))
+
+    def pick(self, population, count, cum_weights):
+        chosen = set()
+        for value in self.random.choices(population, cum_weights=cum_weights,
+                                         k=count * 2):
+            chosen.add(value)
+            if len(chosen) >= count:
+                break
+        return chosen
+
+    def create_tags(self):
+        for name, color, slug in TAGS:
+            Tag.objects.get_or_create(
+                slug=slug, defaults={'name': name, 'color': color})
+        return list(Tag.objects.values_list('id', flat=True))
+
+    def create_users(self, count, prefix):
+        password = make_password(prefix)
+        last_id = User.objects.order_by('-id').values_list(
+            'id', flat=True).first() or 0
+        User.objects.bulk_create((
+            User(username=f'{prefix}_{number}',
+                 email=f'{prefix}_{number}@example.com',
+                 first_name='Пользователь', last_name=str(number),
+                 password=password)
+            for number in range(count)), batch_size=self.batch_size)
+        return list(User.objects.filter(id__gt=last_id).order_by(
+            'id').values_list('id', flat=True))
+
+    def create_image(self):
+        content = io.BytesIO()
+        Image.new('RGB', (640, 480), (226, 108, 45)).save(content, 'JPEG')
+        return recipe_image_storage.save(
+            f'{Recipe.image.field.upload_to}bench.jpg',
+            ContentFile(content.getvalue()))
+
+    def create_recipes(self, count, users, tags, ingredients):
+        image = self.create_image()
+        authors = self.random.choices(
+            users, cum_weights=zipf_cum_weights(len(users), self.skew),
+            k=count)
+        last_id = Recipe.objects.order_by('-id').values_list(
+            'id', flat=True).first() or 0
+        Recipe.objects.bulk_create((
+            Recipe(author_id=author_id,
+                   name=(f'{self.random.choice(WORDS).capitalize()} '
+                         f'{self.random.choice(DISHES)} №{number}'),
+                   text=' '.join(self.random.choices(WORDS + DISHES, k=30)),
+                   cooking_time=self.random.randint(5, 180),
+                   image=image)
+            for number, author_id in enumerate(authors)),
+            batch_size=self.batch_size)
+        recipes = list(Recipe.objects.filter(id__gt=last_id).order_by('id'))
+        ingredient_weights = zipf_cum_weights(len(ingredients), self.skew)
+        Recipe.tags.through.objects.bulk_create((
+            Recipe.tags.through(recipe_id=recipe.id, tag_id=tag_id)
+            for recipe in recipes
+            for tag_id in self.random.sample(
+                tags, self.random.randint(1, len(tags)))),
+            batch_size=self.batch_size)
+        IngredientQuantity.objects.bulk_create((
+            IngredientQuantity(recipe_id=recipe.id, ingredient_id=pk,
+                               amount=self.random.randint(1, 500))
+            for recipe in recipes
+            for pk in self.pick(ingredients, self.random.randint(3, 10),
+                                ingredient_weights)),
+            batch_size=self.batch_size)
+        index_recipes(recipes)
+        return [recipe.id for recipe in recipes]
+
+    def create_relations(self, model, users, recipes, average):
+        weights = zipf_cum_weights(len(recipes), self.skew)
+        model.objects.bulk_create((
+            model(user_id=user_id, recipe_id=recipe_id)
+            for user_id in users
+            for recipe_id in self.pick(
+                recipes, self.random.randint(0, average * 2), weights)),
+            batch_size=self.batch_size, ignore_conflicts=True)
+
+    def create_subscriptions(self, users, average):
+        weights = zipf_cum_weights(len(users), self.skew)
+        Subscription.objects.bulk_create((
+            Subscription(user_id=user_id, author_id=author_id)
+            for user_id in users
+            for author_id in self.pick(
+                users, self.random.randint(0, average * 2), weights)
+            if author_id != user_id),
+            batch_size=self.batch_size, ignore_conflicts=True)
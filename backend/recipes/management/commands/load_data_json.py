@@ -1,19 +1,97 @@
 import csv
+import io
+import json
+import os
 
-from django.core.management.base import BaseCommand
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
 
 from recipes.models import Ingredient
+from recipes.search import ingredient_index
+from recipes.versions import bump_catalog
+
+DEFAULT_PATH = os.path.join(settings.BASE_DIR.parent, 'data',
+                            'ingredients.json')
 
 
 class Command(BaseCommand):
-    help = '''Загрузка информации из csv-файла в базу данных.'''
+    help = '''Загрузка ингредиентов из csv- или json-файлов в базу данных.'''
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', default=[DEFAULT_PATH],
+                            help='Файлы .csv или .json с ингредиентами.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Только показать, что будет загружено.')
+
+    def read_rows(self, path):
+        extension = os.path.splitext(path)[1].lower()
+        try:
+            with open(path, encoding='utf-8') as file:
+                if extension == '.json':
+                    return [(row['name'], row['measurement_unit'])
+                            for row in json.load(file)]
+                if extension == '.csv':
+                    return [(name, measurement_unit)
+                            for name, measurement_unit in csv.reader(file)]
+        except (OSError, ValueError, KeyError) as error:
+            raise CommandError(f'{path}: {error}')
+        raise CommandError(f'{path}: expected a .csv or .json file')
 
     def handle(self, *args, **options):
-        with open('ingredients.csv', encoding='utf-8') as file:
-            file_reader = csv.reader(file)
-            for row in file_reader:
-                name, measurement_unit = row
-                Ingredient.objects.get_or_create(
-                    name=name,
-                    measurement_unit=measurement_unit
-                )
+        rows = {}
+        for path in options['paths']:
+            for row in self.read_rows(path):
+                rows.setdefault(row, None)
+            self.stdout.write(f'Read {path}: {len(rows)} unique rows so far')
+        existing = set(Ingredient.objects.values_list('name',
+                                                      'measurement_unit'))
+        new_rows = [row for row in rows if row not in existing]
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(
+                f'Dry run: {len(new_rows)} new, '
+                f'{len(rows) - len(new_rows)} already loaded'))
+            return
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                created = self.copy_rows(new_rows)
+            else:
+                created = self.bulk_create_rows(new_rows,
+                                                options['batch_size'])
+        ingredient_index.invalidate()
+        bump_catalog()
+        self.stdout.write(self.style.SUCCESS(
+            f'Loaded {created} new ingredients, '
+            f'{len(rows) - created} already present'))
+
+    def bulk_create_rows(self, rows, batch_size):
+        for start in range(0, len(rows), batch_size):
+            Ingredient.objects.bulk_create(
+                (Ingredient(name=name, measurement_unit=measurement_unit)
+                 for name, measurement_unit
+                 in rows[start:start + batch_size]),
+                ignore_conflicts=True)
+            self.stdout.write(
+                f'Inserted {min(start + batch_size, len(rows))}/{len(rows)}')
+        return len(rows)
+
+    def copy_rows(self, rows):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        buffer.seek(0)
+        table = Ingredient._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'CREATE TEMP TABLE ingredient_import '
+                '(name varchar(200), measurement_unit varchar(200)) '
+                'ON COMMIT DROP')
+            cursor.cursor.copy_expert(
+                'COPY ingredient_import FROM STDIN WITH (FORMAT csv)',
+                buffer)
+            self.stdout.write(f'Copied {len(rows)} rows into staging table')
+            cursor.execute(
+                f'INSERT INTO {table} (name, measurement_unit) '
+                f'SELECT name, measurement_unit FROM ingredient_import '
+                f'ON CONFLICT (name, measurement_unit) DO NOTHING')
+            return cursor.rowcount
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from recipes.cart import live_cart_totals
+from recipes.models import ShoppingCartIngredient
+
+
+class Command(BaseCommand):
+    help = '''Пересчёт сводных списков покупок по содержимому корзин.'''
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true',
+                            help='Только сравнить таблицу с корзинами.')
+
+    def handle(self, *args, **options):
+        live = live_cart_totals()
+        stored = {
+            (user_id, ingredient_id): amount
+            for user_id, ingredient_id, amount
+            in ShoppingCartIngredient.objects.values_list(
+                'user_id', 'ingredient_id', 'amount')
+        }
+        drift = {key for key in live.keys() | stored.keys()
+                 if live.get(key) != stored.get(key)}
+        for user_id, ingredient_id in sorted(drift):
+            self.stdout.write(
+                f'user={user_id} ingredient={ingredient_id}: '
+                f'stored={stored.get((user_id, ingredient_id))} '
+                f'live={live.get((user_id, ingredient_id))}')
+        if options['check']:
+            if drift:
+                raise CommandError(f'{len(drift)} rows out of sync')
+            self.stdout.write(self.style.SUCCESS('Cart totals are in sync'))
+            return
+        with transaction.atomic():
+            ShoppingCartIngredient.objects.all().delete()
+            ShoppingCartIngredient.objects.bulk_create(
+                ShoppingCartIngredient(user_id=user_id,
+                                       ingredient_id=ingredient_id,
+                                       amount=amount)
+                for (user_id, ingredient_id), amount in live.items())
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {len(live)} rows, fixed {len(drift)}'))
@@ -0,0 +1,42 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F
+
+from recipes.db import count_of
+from recipes.models import Favorite, Recipe, ShoppingCart
+from users.models import Subscription
+
+User = get_user_model()
+
+COUNTERS = (
+    (Recipe, 'favorites_count', Favorite, 'recipe'),
+    (Recipe, 'cart_count', ShoppingCart, 'recipe'),
+    (User, 'recipes_count', Recipe, 'author'),
+    (User, 'followers_count', Subscription, 'author'),
+)
+
+
+class Command(BaseCommand):
+    help = '''Пересчёт счётчиков избранного, покупок и подписок.'''
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true',
+                            help='Только найти расхождения.')
+
+    def handle(self, *args, **options):
+        total = 0
+        for model, field, counted, relation in COUNTERS:
+            actual = count_of(counted, relation)
+            drifted = list(model.objects.annotate(actual=actual).exclude(
+                **{field: F('actual')}).values_list('pk', flat=True))
+            total += len(drifted)
+            self.stdout.write(
+                f'{model.__name__}.{field}: {len(drifted)} out of sync')
+            if drifted and not options['check']:
+                model.objects.filter(pk__in=drifted).update(**{field: actual})
+        if options['check']:
+            if total:
+                raise CommandError(f'{total} counters out of sync')
+            self.stdout.write(self.style.SUCCESS('Counters are in sync'))
+            return
+        self.stdout.write(self.style.SUCCESS(f'Fixed {total} counters'))
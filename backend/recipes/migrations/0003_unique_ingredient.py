@@ -0,0 +1,58 @@
+# Generated by Django 3.2.18 on 2026-10-18 02:47
+
+from django.db import migrations, models
+
+MAX_AMOUNT = 32767
+
+
+def merge_rows(model, owner, keep, duplicates, limit=None):
+    rows = {getattr(row, owner): row
+            for row in model.objects.filter(ingredient_id=keep)}
+    for row in model.objects.filter(
+            ingredient_id__in=duplicates).order_by('id'):
+        kept = rows.get(getattr(row, owner))
+        if kept is None:
+            row.ingredient_id = keep
+            row.save(update_fields=['ingredient'])
+            rows[getattr(row, owner)] = row
+            continue
+        kept.amount += row.amount
+        if limit is not None:
+            kept.amount = min(kept.amount, limit)
+        kept.save(update_fields=['amount'])
+        row.delete()
+
+
+def merge_duplicate_ingredients(apps, schema_editor):
+    Ingredient = apps.get_model('recipes', 'Ingredient')
+    IngredientQuantity = apps.get_model('recipes', 'IngredientQuantity')
+    ShoppingCartIngredient = apps.get_model('recipes',
+                                            'ShoppingCartIngredient')
+    groups = Ingredient.objects.values('name', 'measurement_unit').annotate(
+        keep=models.Min('id'), total=models.Count('id')).filter(
+        total__gt=1).order_by()
+    for group in groups:
+        duplicates = list(Ingredient.objects.filter(
+            name=group['name'], measurement_unit=group['measurement_unit'],
+        ).exclude(id=group['keep']).values_list('id', flat=True))
+        merge_rows(IngredientQuantity, 'recipe_id', group['keep'],
+                   duplicates, MAX_AMOUNT)
+        merge_rows(ShoppingCartIngredient, 'user_id', group['keep'],
+                   duplicates)
+        Ingredient.objects.filter(id__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0002_shoppingcartingredient'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_ingredients,
+                             migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='ingredient',
+            constraint=models.UniqueConstraint(fields=('name', 'measurement_unit'), name='unique_ingredient'),
+        ),
+    ]
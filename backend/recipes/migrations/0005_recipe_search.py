@@ -0,0 +1,76 @@
+# Generated by Django 3.2.18 on 2026-10-18 02:51
+
+import re
+
+from django.conf import settings
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations, models
+import django.db.models.deletion
+
+NAME_WEIGHT = 4
+TEXT_WEIGHT = 1
+
+
+def recipe_terms(recipe):
+    weights = {}
+    for field, weight in ((recipe.text, TEXT_WEIGHT),
+                          (recipe.name, NAME_WEIGHT)):
+        for term in re.findall(r'\w+', field.casefold()):
+            weights[term[:100]] = max(weights.get(term[:100], 0), weight)
+    return weights
+
+
+def build_search_index(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    RecipeSearchTerm = apps.get_model('recipes', 'RecipeSearchTerm')
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX recipe_search_vector_gin ON recipes_recipe '
+            'USING gin (search_vector)')
+        Recipe.objects.update(search_vector=(
+            SearchVector('name', weight='A', config=settings.SEARCH_CONFIG)
+            + SearchVector('text', weight='B',
+                           config=settings.SEARCH_CONFIG)))
+        return
+    for recipe in Recipe.objects.only('name', 'text').iterator():
+        RecipeSearchTerm.objects.bulk_create(
+            RecipeSearchTerm(recipe=recipe, term=term, weight=weight)
+            for term, weight in recipe_terms(recipe).items())
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS recipe_search_vector_gin')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0004_recipe_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Поисковый вектор'),
+        ),
+        migrations.CreateModel(
+            name='RecipeSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(db_index=True, max_length=100, verbose_name='Слово')),
+                ('weight', models.PositiveSmallIntegerField(verbose_name='Вес')),
+                ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='recipes.recipe', verbose_name='Рецепт')),
+            ],
+            options={
+                'verbose_name': 'Слово поискового индекса',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='recipesearchterm',
+            constraint=models.UniqueConstraint(fields=('recipe', 'term'), name='unique_recipe_term'),
+        ),
+        migrations.RunPython(build_search_index, drop_search_index),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 3.2.18 on 2026-10-18 03:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0009_catalog_version'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='recipedeletion',
+            name='author_id',
+            field=models.PositiveBigIntegerField(verbose_name='Автор публикации'),
+        ),
+        migrations.AlterField(
+            model_name='recipedeletion',
+            name='recipe_id',
+            field=models.PositiveBigIntegerField(verbose_name='Рецепт'),
+        ),
+    ]
@@ -1,6 +1,13 @@
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator
 from django.db import models
+from django.db.models import Exists, F, OuterRef, Prefetch, Value, Window
+from django.db.models.functions import RowNumber
+
+from users.models import Subscription
+
+from .storage import recipe_image_storage
 
 User = get_user_model()
 
@@ -12,6 +19,12 @@ class Ingredient(models.Model):
     class Meta:
         ordering = ('name', )
         verbose_name = 'Ингредиент'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['name', 'measurement_unit'],
+                name='unique_ingredient'
+            )
+        ]
 
     def __str__(self):
         return self.name
@@ -31,12 +44,59 @@ class Tag(models.Model):
         return self.name
 
 
+class RecipeQuerySet(models.QuerySet):
+    def with_related(self):
+        return self.select_related('author').prefetch_related(
+            'tags',
+            Prefetch('amount',
+                     queryset=IngredientQuantity.objects.select_related(
+                         'ingredient')))
+
+    def with_user_flags(self, user):
+        if not user.is_authenticated:
+            return self.annotate(is_favorited=Value(False),
+                                 is_in_shopping_cart=Value(False),
+                                 author_is_subscribed=Value(False))
+        return self.annotate(
+            is_favorited=Exists(Favorite.objects.filter(
+                user=user, recipe=OuterRef('pk'))),
+            is_in_shopping_cart=Exists(ShoppingCart.objects.filter(
+                user=user, recipe=OuterRef('pk'))),
+            author_is_subscribed=Exists(Subscription.objects.filter(
+                user=user, author=OuterRef('author'))))
+
+    def latest_by_author(self, author_ids, limit=None):
+        queryset = self.filter(author_id__in=author_ids).order_by('-id')
+        if limit is not None:
+            ranked = queryset.annotate(recipe_rank=Window(
+                RowNumber(), partition_by=[F('author_id')],
+                order_by=F('id').desc())).values('id', 'recipe_rank')
+            sql, params = ranked.query.sql_with_params()
+            queryset = self.raw(
+                f'SELECT * FROM {self.model._meta.db_table} WHERE id IN '
+                f'(SELECT id FROM ({sql}) ranked WHERE recipe_rank <= %s) '
+                f'ORDER BY id DESC', (*params, limit))
+        recipes = {author_id: [] for author_id in author_ids}
+        for recipe in queryset:
+            recipes[recipe.author_id].append(recipe)
+        return recipes
+
+
 class Recipe(models.Model):
     author = models.ForeignKey(User, on_delete=models.CASCADE,
                                verbose_name='Автор публикации',
                                related_name='recipes')
     name = models.CharField('Название', max_length=200)
-    image = models.ImageField('Картинка', )
+    image = models.ImageField('Картинка', upload_to='recipes/',
+                              storage=recipe_image_storage)
+    image_variants = models.JSONField('Уменьшенные копии картинки',
+                                      default=dict, blank=True)
+    search_vector = SearchVectorField('Поисковый вектор', null=True,
+                                      editable=False)
+    favorites_count = models.PositiveIntegerField(
+        'Добавлений в избранное', default=0, editable=False, db_index=True)
+    cart_count = models.PositiveIntegerField(
+        'Добавлений в список покупок', default=0, editable=False)
     text = models.TextField('Текстовое описание', )
     ingredients = models.ManyToManyField(Ingredient,
                                          verbose_name='Ингредиенты',
@@ -47,6 +107,10 @@ class Recipe(models.Model):
         validators=[MinValueValidator(1)],)
     pub_date = models.DateTimeField('Дата публикации', auto_now_add=True,
                                     db_index=True)
+    updated_at = models.DateTimeField('Дата изменения', auto_now=True,
+                                      db_index=True)
+
+    objects = RecipeQuerySet.as_manager()
 
     class Meta:
         ordering = ('-id', )
@@ -57,6 +121,10 @@ class Recipe(models.Model):
                 name='unique_author_name'
             )
         ]
+        indexes = [
+            models.Index(fields=['updated_at', 'id'],
+                         name='recipe_updated_at_id'),
+        ]
 
     def __str__(self):
         return f'Рецепт {self.name}'
@@ -125,3 +193,70 @@ class IngredientQuantity(models.Model):
                 name='recipes_ingredient_2',
             )
         ]
+
+
+class ShoppingCartIngredient(models.Model):
+    user = models.ForeignKey(User, verbose_name='Пользователь',
+                             related_name='cart_ingredients',
+                             on_delete=models.CASCADE)
+    ingredient = models.ForeignKey(Ingredient, verbose_name='Ингредиент',
+                                   related_name='cart_totals',
+                                   on_delete=models.CASCADE)
+    amount = models.PositiveIntegerField('Количество ингредиента')
+
+    class Meta:
+        ordering = ('ingredient__name', )
+        verbose_name = 'Ингредиент в списке покупок'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'ingredient'],
+                name='unique_cart_ingredient'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.user}: {self.ingredient} {self.amount}'
+
+
+class RecipeSearchTerm(models.Model):
+    recipe = models.ForeignKey(Recipe, verbose_name='Рецепт',
+                               related_name='search_terms',
+                               on_delete=models.CASCADE)
+    term = models.CharField('Слово', max_length=100, db_index=True)
+    weight = models.PositiveSmallIntegerField('Вес')
+
+    class Meta:
+        verbose_name = 'Слово поискового индекса'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['recipe', 'term'],
+                name='unique_recipe_term'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.recipe}: {self.term}'
+
+
+class RecipeDeletion(models.Model):
+    recipe_id = models.PositiveBigIntegerField('Рецепт')
+    author_id = models.PositiveBigIntegerField('Автор публикации')
+    deleted_at = models.DateTimeField('Дата удаления', auto_now_add=True,
+                                      db_index=True)
+
+    class Meta:
+        ordering = ('id', )
+        verbose_name = 'Удалённый рецепт'
+
+    def __str__(self):
+        return f'Рецепт {self.recipe_id} удалён {self.deleted_at}'
+
+
+class CatalogVersion(models.Model):
+    version = models.PositiveBigIntegerField('Версия', default=0)
+
+    class Meta:
+        verbose_name = 'Версия справочников'
+
+    def __str__(self):
+        return f'Справочники v{self.version}'
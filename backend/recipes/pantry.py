@@ -0,0 +1,146 @@
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import IngredientQuantity
+
+
+def popcount(mask):
+    return bin(mask).count('1')
+
+
+def iter_bits(mask):
+    while mask:
+        lowest = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
+
+
+def add_bitset(counter, bitset):
+    for digit, value in enumerate(counter):
+        counter[digit], bitset = value ^ bitset, value & bitset
+        if not bitset:
+            return
+    counter.append(bitset)
+
+
+def at_least(counter, value, alive):
+    if value.bit_length() > len(counter):
+        return 0
+    greater, equal = 0, alive
+    for digit in reversed(range(len(counter))):
+        if value >> digit & 1:
+            equal &= counter[digit]
+        else:
+            greater |= equal & counter[digit]
+    return greater | equal
+
+
+class RecipeIngredientIndex:
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._built_at = 0
+        self._recipes = None
+
+    def invalidate(self):
+        with self._lock:
+            self._recipes = None
+
+    def _build(self):
+        self._recipes = {}
+        self._recipe_ids = []
+        self._positions = {}
+        self._ingredients = {}
+        self._sizes = {}
+        self._alive = 0
+        for recipe_id, ingredient_id in (
+                IngredientQuantity.objects.order_by().values_list(
+                    'recipe_id', 'ingredient_id').iterator()):
+            self._set_recipe(recipe_id, self._recipes.get(recipe_id, 0)
+                             | 1 << ingredient_id)
+        self._built_at = time.monotonic()
+
+    def _ensure_built(self):
+        if (self._recipes is None
+                or time.monotonic() - self._built_at > self.ttl):
+            self._build()
+
+    def _set_recipe(self, recipe_id, mask):
+        position = self._positions.get(recipe_id)
+        if position is None:
+            position = self._positions[recipe_id] = len(self._recipe_ids)
+            self._recipe_ids.append(recipe_id)
+        bit = 1 << position
+        old_mask = self._recipes.get(recipe_id, 0)
+        for ingredient_id in iter_bits(old_mask & ~mask):
+            self._ingredients[ingredient_id] &= ~bit
+        for ingredient_id in iter_bits(mask & ~old_mask):
+            self._ingredients[ingredient_id] = (
+                self._ingredients.get(ingredient_id, 0) | bit)
+        old_size, size = popcount(old_mask), popcount(mask)
+        if old_size != size:
+            if old_size:
+                self._sizes[old_size] &= ~bit
+            if size:
+                self._sizes[size] = self._sizes.get(size, 0) | bit
+        if mask:
+            self._recipes[recipe_id] = mask
+            self._alive |= bit
+        else:
+            self._recipes.pop(recipe_id, None)
+            self._alive &= ~bit
+
+    def update_recipe(self, recipe_id, ingredient_ids):
+        mask = 0
+        for ingredient_id in ingredient_ids:
+            mask |= 1 << ingredient_id
+        with self._lock:
+            if self._recipes is not None:
+                self._set_recipe(recipe_id, mask)
+
+    def refresh_recipe(self, recipe_id):
+        self.update_recipe(recipe_id, IngredientQuantity.objects.filter(
+            recipe_id=recipe_id).values_list('ingredient_id', flat=True))
+
+    def schedule_refresh(self, recipe_id):
+        transaction.on_commit(lambda: self.refresh_recipe(recipe_id))
+
+    def remove_recipe(self, recipe_id):
+        self.update_recipe(recipe_id, ())
+
+    def _covered(self, pantry, coverage):
+        matched = []
+        for ingredient_id in set(pantry):
+            add_bitset(matched, self._ingredients.get(ingredient_id, 0))
+        found = 0
+        for size, recipes in self._sizes.items():
+            found |= at_least(matched, math.ceil(coverage * size / 100),
+                              recipes)
+        return found
+
+    def filter_queryset(self, queryset, include=(), exclude=(), pantry=None,
+                        coverage=100):
+        with self._lock:
+            self._ensure_built()
+            found = self._alive
+            for ingredient_id in include:
+                found &= self._ingredients.get(ingredient_id, 0)
+            for ingredient_id in exclude:
+                found &= ~self._ingredients.get(ingredient_id, 0)
+            if pantry is not None:
+                found &= self._covered(pantry, coverage)
+            rest = self._alive & ~found
+            if popcount(found) <= popcount(rest):
+                return queryset.filter(id__in=[
+                    self._recipe_ids[position]
+                    for position in iter_bits(found)])
+            return queryset.exclude(id__in=[
+                self._recipe_ids[position] for position in iter_bits(rest)])
+
+
+recipe_ingredient_index = RecipeIngredientIndex(
+    ttl=settings.RECIPE_INGREDIENT_INDEX_TTL)
@@ -0,0 +1,125 @@
+import bisect
+import re
+import threading
+import time
+from functools import reduce
+from itertools import chain, islice
+from operator import or_
+
+from django.conf import settings
+from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                            SearchVector)
+from django.db import connection, transaction
+from django.db.models import Exists, F, OuterRef, Q, Subquery, Sum
+
+from .models import Ingredient, Recipe, RecipeSearchTerm
+
+NAME_WEIGHT = 4
+TEXT_WEIGHT = 1
+
+
+class IngredientIndex:
+    def __init__(self, ttl, limit):
+        self.ttl = ttl
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._keys = None
+        self._rows = None
+        self._built_at = 0
+
+    def invalidate(self):
+        with self._lock:
+            self._keys = self._rows = None
+
+    def _build(self):
+        rows = sorted(
+            Ingredient.objects.values('id', 'name', 'measurement_unit'),
+            key=lambda row: (row['name'].casefold(), row['id']))
+        return [row['name'].casefold() for row in rows], rows
+
+    def _load(self):
+        with self._lock:
+            expired = time.monotonic() - self._built_at > self.ttl
+            if self._keys is None or expired:
+                self._keys, self._rows = self._build()
+                self._built_at = time.monotonic()
+            return self._keys, self._rows
+
+    def search(self, name, measurement_unit=None):
+        keys, rows = self._load()
+        name = name.casefold()
+        start = bisect.bisect_left(keys, name)
+        end = bisect.bisect_left(keys, name + chr(0x10FFFF), lo=start)
+        contains = (index for index in chain(range(start),
+                                             range(end, len(keys)))
+                    if name in keys[index])
+        found = (rows[index] for index in chain(range(start, end), contains))
+        if measurement_unit:
+            found = (row for row in found
+                     if row['measurement_unit'] == measurement_unit)
+        return list(islice(found, self.limit))
+
+
+ingredient_index = IngredientIndex(ttl=settings.INGREDIENT_INDEX_TTL,
+                                   limit=settings.INGREDIENT_SEARCH_LIMIT)
+
+
+def tokenize(value):
+    return [term[:100] for term in re.findall(r'\w+', value.casefold())]
+
+
+def recipe_search_vector():
+    return (SearchVector('name', weight='A', config=settings.SEARCH_CONFIG)
+            + SearchVector('text', weight='B', config=settings.SEARCH_CONFIG))
+
+
+def recipe_terms(recipe):
+    weights = {}
+    for field, weight in ((recipe.text, TEXT_WEIGHT),
+                          (recipe.name, NAME_WEIGHT)):
+        for term in tokenize(field):
+            weights[term] = max(weights.get(term, 0), weight)
+    return weights
+
+
+def index_recipe(recipe):
+    if connection.vendor == 'postgresql':
+        Recipe.objects.filter(pk=recipe.pk).update(
+            search_vector=recipe_search_vector())
+        return
+    with transaction.atomic():
+        RecipeSearchTerm.objects.filter(recipe=recipe).delete()
+        RecipeSearchTerm.objects.bulk_create(
+            RecipeSearchTerm(recipe=recipe, term=term, weight=weight)
+            for term, weight in recipe_terms(recipe).items())
+
+
+def index_recipes(recipes):
+    if connection.vendor == 'postgresql':
+        Recipe.objects.filter(pk__in=[recipe.pk for recipe in recipes]).update(
+            search_vector=recipe_search_vector())
+        return
+    RecipeSearchTerm.objects.bulk_create(
+        RecipeSearchTerm(recipe=recipe, term=term, weight=weight)
+        for recipe in recipes
+        for term, weight in recipe_terms(recipe).items())
+
+
+def search_recipes(queryset, value):
+    if connection.vendor == 'postgresql':
+        query = SearchQuery(value, config=settings.SEARCH_CONFIG,
+                            search_type='websearch')
+        return queryset.filter(search_vector=query).annotate(
+            rank=SearchRank(F('search_vector'), query)
+        ).order_by('-rank', '-id')
+    terms = tokenize(value)
+    if not terms:
+        return queryset.none()
+    for term in terms:
+        queryset = queryset.filter(Exists(RecipeSearchTerm.objects.filter(
+            recipe=OuterRef('pk'), term__startswith=term)))
+    rank = RecipeSearchTerm.objects.filter(
+        reduce(or_, (Q(term__startswith=term) for term in terms)),
+        recipe=OuterRef('pk')).values('recipe').annotate(
+        total=Sum('weight')).values('total')
+    return queryset.annotate(rank=Subquery(rank)).order_by('-rank', '-id')
@@ -0,0 +1,93 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+
+from users.models import Subscription
+
+from .cart import remove_recipe_from_carts
+from .db import change_counter
+from .models import Ingredient, Recipe, RecipeDeletion, Tag
+from .pantry import recipe_ingredient_index
+from .search import index_recipe, ingredient_index
+from .versions import (RECIPES, author_key, bump_catalog, bump_on_commit,
+                       bump_recipe, recipe_key)
+
+User = get_user_model()
+USER_FIELDS = {'email', 'username', 'first_name', 'last_name'}
+
+
+@receiver((post_save, post_delete), sender=Ingredient)
+def invalidate_ingredient_index(sender, **kwargs):
+    ingredient_index.invalidate()
+
+
+@receiver(post_save, sender=Recipe)
+def update_recipe_search_index(sender, instance, **kwargs):
+    index_recipe(instance)
+
+
+@receiver(post_save, sender=Recipe)
+def count_created_recipe(sender, instance, created, **kwargs):
+    if created:
+        change_counter(User.objects.filter(pk=instance.author_id),
+                       'recipes_count', 1)
+
+
+@receiver(post_delete, sender=Recipe)
+def count_deleted_recipe(sender, instance, **kwargs):
+    change_counter(User.objects.filter(pk=instance.author_id),
+                   'recipes_count', -1)
+
+
+@receiver(post_delete, sender=Recipe)
+def record_recipe_deletion(sender, instance, **kwargs):
+    RecipeDeletion.objects.create(recipe_id=instance.id,
+                                  author_id=instance.author_id)
+
+
+@receiver(pre_delete, sender=User)
+def release_user_counters(sender, instance, **kwargs):
+    change_counter(Recipe.objects.filter(favorites__user=instance),
+                   'favorites_count', -1)
+    change_counter(Recipe.objects.filter(cart__user=instance),
+                   'cart_count', -1)
+    change_counter(User.objects.filter(
+        pk__in=Subscription.objects.filter(user=instance).values('author')),
+        'followers_count', -1)
+
+
+@receiver(pre_delete, sender=Recipe)
+def remove_recipe_from_cart_totals(sender, instance, **kwargs):
+    remove_recipe_from_carts(instance.id)
+
+
+@receiver(post_delete, sender=Recipe)
+def remove_recipe_from_ingredient_index(sender, instance, **kwargs):
+    recipe_ingredient_index.remove_recipe(instance.id)
+
+
+@receiver((post_save, post_delete), sender=Recipe)
+def bump_recipe_version(sender, instance, **kwargs):
+    bump_recipe(instance.id, instance.author_id)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def bump_recipe_tags_version(sender, instance, action, **kwargs):
+    if action.startswith('post_') and isinstance(instance, Recipe):
+        bump_recipe(instance.id, instance.author_id)
+
+
+@receiver((post_save, post_delete), sender=Tag)
+@receiver((post_save, post_delete), sender=Ingredient)
+def bump_catalog_version(sender, **kwargs):
+    bump_catalog()
+
+
+@receiver(post_save, sender=User)
+def bump_author_version(sender, instance, created, update_fields, **kwargs):
+    if created or (update_fields and not USER_FIELDS & set(update_fields)):
+        return
+    bump_on_commit(RECIPES, author_key(instance.id), *(
+        recipe_key(pk)
+        for pk in instance.recipes.values_list('id', flat=True)))
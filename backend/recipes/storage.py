@@ -0,0 +1,27 @@
+import hashlib
+import os
+
+from django.core.files.storage import FileSystemStorage
+
+
+def content_hash(content):
+    digest = hashlib.sha256()
+    content.seek(0)
+    for chunk in content.chunks():
+        digest.update(chunk)
+    content.seek(0)
+    return digest.hexdigest()
+
+
+class ContentHashStorage(FileSystemStorage):
+    def _save(self, name, content):
+        directory, filename = os.path.split(name)
+        digest = content_hash(content)
+        name = os.path.join(directory, digest[:2],
+                            digest + os.path.splitext(filename)[1].lower())
+        if self.exists(name):
+            return name
+        return super()._save(name, content)
+
+
+recipe_image_storage = ContentHashStorage()
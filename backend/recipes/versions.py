@@ -0,0 +1,53 @@
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+from .models import CatalogVersion
+
+CATALOG = 'version:catalog'
+RECIPES = 'version:recipes'
+
+
+def author_key(author_id):
+    return f'version:author:{author_id}'
+
+
+def recipe_key(recipe_id):
+    return f'version:recipe:{recipe_id}'
+
+
+def get_versions(*keys):
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump(*keys):
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), timeout=None)
+
+
+def bump_on_commit(*keys):
+    transaction.on_commit(lambda: bump(*keys))
+
+
+def bump_recipe(recipe_id, author_id):
+    bump_on_commit(RECIPES, author_key(author_id), recipe_key(recipe_id))
+
+
+def catalog_version():
+    return CatalogVersion.objects.values_list('version', flat=True).first()
+
+
+def bump_catalog():
+    if not CatalogVersion.objects.update(version=F('version') + 1):
+        CatalogVersion.objects.create(version=1)
+    bump_on_commit(CATALOG)
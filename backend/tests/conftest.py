@@ -0,0 +1,100 @@
+import pytest
+from django.conf import settings as django_settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from api.authentication import token_cache
+from recipes.models import (Favorite, Ingredient, IngredientQuantity, Recipe,
+                            ShoppingCart, Tag)
+from users.models import Subscription
+
+User = get_user_model()
+
+IMAGE = ('data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJ'
+         'AAAADUlEQVR42mNk+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg==')
+FULL_PAGE = django_settings.PAGE_SIZE
+
+
+@pytest.fixture(autouse=True)
+def isolated(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.SQL_INSTRUMENTATION_SAMPLE_RATE = 0
+    cache.clear()
+    token_cache.tokens.clear()
+
+
+@pytest.fixture
+def users(db):
+    return [User.objects.create_user(
+        username=f'user{number}', email=f'user{number}@example.com',
+        first_name='Имя', last_name='Фамилия', password='password12345')
+        for number in range(FULL_PAGE + 2)]
+
+
+@pytest.fixture
+def user(users):
+    return users[0]
+
+
+@pytest.fixture
+def tags(db):
+    return [Tag.objects.create(name=name, color=color, slug=slug)
+            for name, color, slug in (('Завтрак', '#E26C2D', 'breakfast'),
+                                      ('Обед', '#49B64E', 'lunch'),
+                                      ('Ужин', '#8775D2', 'dinner'))]
+
+
+@pytest.fixture
+def ingredients(db):
+    return [Ingredient.objects.create(name=name, measurement_unit='г')
+            for name in ('Соль', 'Сахар', 'Мука', 'Молоко', 'Сыр', 'Яйца')]
+
+
+def create_recipe(author, tags, ingredients, name='Рецепт', text='Текст'):
+    recipe = Recipe.objects.create(author=author, name=name, text=text,
+                                   image='recipes/images/recipe.png',
+                                   cooking_time=10)
+    recipe.tags.set(tags)
+    IngredientQuantity.objects.bulk_create(
+        IngredientQuantity(recipe=recipe, ingredient=ingredient,
+                           amount=number + 1)
+        for number, ingredient in enumerate(ingredients))
+    return recipe
+
+
+@pytest.fixture
+def recipes(users, tags, ingredients):
+    return [create_recipe(users[1 + number % (len(users) - 1)],
+                          tags[:1 + number % len(tags)],
+                          ingredients[:2 + number % 3],
+                          name=f'Рецепт {number}')
+            for number in range(FULL_PAGE * 2)]
+
+
+@pytest.fixture
+def activity(user, users, recipes):
+    for recipe in recipes:
+        Favorite.objects.create(user=user, recipe=recipe)
+        ShoppingCart.objects.create(user=user, recipe=recipe)
+    for author in users[1:]:
+        Subscription.objects.create(user=user, author=author)
+
+
+def client_for(user=None):
+    client = APIClient()
+    if user is not None:
+        client.credentials(HTTP_AUTHORIZATION=(
+            f'Token {Token.objects.get_or_create(user=user)[0].key}'))
+    return client
+
+
+@pytest.fixture
+def client(user):
+    return client_for(user)
+
+
+@pytest.fixture
+def anonymous_client():
+    return client_for()
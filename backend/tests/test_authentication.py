@@ -0,0 +1,18 @@
+from rest_framework.authtoken.models import Token
+
+from api.authentication import TokenCache
+
+
+def test_shared_cache_sees_revocation_from_other_workers(user):
+    token = Token.objects.create(user=user)
+    worker, other = TokenCache(10, 60, True), TokenCache(10, 60, True)
+    worker.set(token.key, token)
+    assert other.get(token.key).user == user
+    other.delete(token.key)
+    assert worker.get(token.key) is None
+
+
+def test_logout_revokes_cached_token(client):
+    assert client.get('/api/users/me/').status_code == 200
+    assert client.post('/api/auth/token/logout/').status_code == 204
+    assert client.get('/api/users/me/').status_code == 401
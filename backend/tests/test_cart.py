@@ -0,0 +1,39 @@
+from recipes.cart import live_cart_totals
+from recipes.models import ShoppingCartIngredient
+
+from .conftest import client_for
+
+
+def stored_cart_totals():
+    return {(row.user_id, row.ingredient_id): row.amount
+            for row in ShoppingCartIngredient.objects.all()}
+
+
+def test_cart_totals_follow_recipe_changes(client, users, recipes,
+                                           ingredients):
+    shopper = users[-1]
+    for user_client in (client, client_for(shopper)):
+        user_client.post('/api/recipes/shopping_cart/',
+                         {'recipes': [recipe.id for recipe in recipes[:4]]},
+                         format='json')
+    assert stored_cart_totals() == live_cart_totals()
+    response = client_for(recipes[0].author).patch(
+        f'/api/recipes/{recipes[0].id}/', {'ingredients': [
+            {'id': ingredients[0].id, 'amount': 50},
+            {'id': ingredients[5].id, 'amount': 7}]}, format='json')
+    assert response.status_code == 200
+    assert stored_cart_totals() == live_cart_totals()
+    recipes[1].delete()
+    assert stored_cart_totals() == live_cart_totals()
+    client.delete('/api/recipes/shopping_cart/',
+                  {'recipes': [recipe.id for recipe in recipes[2:4]]},
+                  format='json')
+    assert stored_cart_totals() == live_cart_totals()
+
+
+def test_cart_add_merges_into_concurrently_created_row(client, user, recipes):
+    ShoppingCartIngredient.objects.create(
+        user=user, ingredient=recipes[0].ingredients.first(), amount=0)
+    response = client.post(f'/api/recipes/{recipes[0].id}/shopping_cart/')
+    assert response.status_code == 201
+    assert stored_cart_totals() == live_cart_totals()
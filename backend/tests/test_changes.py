@@ -0,0 +1,32 @@
+from .conftest import client_for, create_recipe
+
+
+def test_feed_reports_every_deletion(settings, anonymous_client, users,
+                                     recipes):
+    settings.SYNC_SAFETY_MARGIN = 0
+    cursor = anonymous_client.get('/api/recipes/changes/').data['cursor']
+    expected = {recipes[0].id, recipes[1].id}
+    response = client_for(recipes[0].author).delete(
+        f'/api/recipes/{recipes[0].id}/')
+    assert response.status_code == 204
+    recipes[1].delete()
+    author = recipes[2].author
+    expected.update(author.recipes.values_list('id', flat=True))
+    author.delete()
+    response = anonymous_client.get(f'/api/recipes/changes/?cursor={cursor}')
+    assert set(response.data['deleted']) == expected
+
+
+def test_feed_holds_back_uncommitted_window(settings, anonymous_client,
+                                            user, tags, ingredients):
+    settings.SYNC_SAFETY_MARGIN = 0
+    cursor = anonymous_client.get('/api/recipes/changes/').data['cursor']
+    recipe = create_recipe(user, tags, ingredients)
+    recipe.delete()
+    settings.SYNC_SAFETY_MARGIN = 60
+    response = anonymous_client.get(f'/api/recipes/changes/?cursor={cursor}')
+    assert response.data['recipes'] == response.data['deleted'] == []
+    assert response.data['cursor'] == cursor
+    settings.SYNC_SAFETY_MARGIN = 0
+    response = anonymous_client.get(f'/api/recipes/changes/?cursor={cursor}')
+    assert len(response.data['deleted']) == 1
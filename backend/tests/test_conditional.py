@@ -0,0 +1,23 @@
+import io
+
+from django.core.cache import cache
+from django.core.management import call_command
+
+from recipes.models import Ingredient
+
+
+def test_catalog_etag_survives_other_processes(anonymous_client, ingredients,
+                                               tmp_path):
+    response = anonymous_client.get('/api/ingredients/')
+    etag = response['ETag']
+    cached = anonymous_client.get('/api/ingredients/', HTTP_IF_NONE_MATCH=etag)
+    assert cached.status_code == 304
+    assert 'max-age' in cached['Cache-Control']
+    source = tmp_path / 'ingredients.csv'
+    source.write_text('Шафран,г\n', encoding='utf-8')
+    call_command('load_data_json', str(source), stdout=io.StringIO())
+    cache.clear()
+    response = anonymous_client.get('/api/ingredients/',
+                                    HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert Ingredient.objects.filter(name='Шафран').exists()
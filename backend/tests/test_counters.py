@@ -0,0 +1,49 @@
+import io
+
+from django.core.management import call_command
+
+from recipes.models import Recipe
+from users.models import User
+
+
+def assert_counters_in_sync():
+    output = io.StringIO()
+    call_command('reconcile_counters', check=True, stdout=output)
+    assert 'in sync' in output.getvalue()
+
+
+def test_api_changes_keep_counters(client, user, users, recipes):
+    recipe = recipes[0]
+    client.post(f'/api/recipes/{recipe.id}/favorite/')
+    client.post(f'/api/recipes/{recipe.id}/shopping_cart/')
+    client.post(f'/api/users/{users[1].id}/subscribe/')
+    recipe.refresh_from_db()
+    assert (recipe.favorites_count, recipe.cart_count) == (1, 1)
+    assert User.objects.get(pk=users[1].pk).followers_count == 1
+    assert_counters_in_sync()
+
+
+def test_account_deletion_releases_counters(client, user, users, recipes):
+    client.post('/api/recipes/favorite/',
+                {'recipes': [recipe.id for recipe in recipes]}, format='json')
+    client.post('/api/recipes/shopping_cart/',
+                {'recipes': [recipe.id for recipe in recipes]}, format='json')
+    client.post(f'/api/users/{users[1].id}/subscribe/')
+    response = client.delete('/api/users/me/',
+                             {'current_password': 'password12345'},
+                             format='json')
+    assert response.status_code == 204
+    assert not Recipe.objects.filter(favorites_count__gt=0).exists()
+    assert not Recipe.objects.filter(cart_count__gt=0).exists()
+    assert User.objects.get(pk=users[1].pk).followers_count == 0
+    assert_counters_in_sync()
+
+
+def test_recipe_deletion_outside_api(users, recipes):
+    author = recipes[0].author
+    recipes[0].delete()
+    Recipe.objects.filter(pk=recipes[1].pk).delete()
+    author.refresh_from_db()
+    assert author.recipes_count == author.recipes.count()
+    author.delete()
+    assert_counters_in_sync()
@@ -0,0 +1,22 @@
+import io
+
+from django.conf import settings
+from django.core.management import call_command
+
+
+def test_autocomplete_is_capped(db, anonymous_client):
+    call_command('load_data_json', stdout=io.StringIO())
+    response = anonymous_client.get('/api/ingredients/', {'name': 'а'})
+    names = [row['name'].casefold() for row in response.data]
+    assert len(names) == settings.INGREDIENT_SEARCH_LIMIT
+    assert all('а' in name for name in names)
+    prefixed = [name.startswith('а') for name in names]
+    assert prefixed == sorted(prefixed, reverse=True)
+
+
+def test_autocomplete_filters_before_capping(db, anonymous_client):
+    call_command('load_data_json', stdout=io.StringIO())
+    response = anonymous_client.get(
+        '/api/ingredients/', {'name': 'а', 'measurement_unit': 'г'})
+    assert len(response.data) == settings.INGREDIENT_SEARCH_LIMIT
+    assert {row['measurement_unit'] for row in response.data} == {'г'}
@@ -0,0 +1,57 @@
+import random
+
+import pytest
+
+from recipes.models import Recipe
+from recipes.pantry import RecipeIngredientIndex
+
+from .conftest import create_recipe
+
+
+@pytest.fixture
+def pantry_recipes(user, tags, ingredients):
+    generator = random.Random(7)
+    return {
+        create_recipe(user, tags[:1], chosen, name=f'Рецепт {number}').id:
+        {ingredient.id for ingredient in chosen}
+        for number in range(40)
+        for chosen in [generator.sample(ingredients,
+                                        generator.randint(1, 5))]}
+
+
+def expected_ids(recipes, include, exclude, pantry, coverage):
+    return {
+        recipe_id for recipe_id, ingredient_ids in recipes.items()
+        if set(include) <= ingredient_ids
+        and not set(exclude) & ingredient_ids
+        and (pantry is None
+             or len(ingredient_ids & set(pantry)) * 100
+             >= coverage * len(ingredient_ids))}
+
+
+def test_index_matches_brute_force(pantry_recipes, ingredients):
+    index = RecipeIngredientIndex(ttl=60)
+    generator = random.Random(11)
+    ids = [ingredient.id for ingredient in ingredients]
+    for _ in range(200):
+        criteria = {
+            'include': generator.sample(ids, generator.randint(0, 2)),
+            'exclude': generator.sample(ids, generator.randint(0, 2)),
+            'pantry': (generator.sample(ids, generator.randint(0, 6))
+                       if generator.random() < 0.7 else None),
+            'coverage': generator.choice((0, 34, 50, 75, 100)),
+        }
+        found = index.filter_queryset(Recipe.objects.all(), **criteria)
+        assert set(found.values_list('id', flat=True)) == expected_ids(
+            pantry_recipes, **criteria)
+
+
+def test_large_matches_use_complement(pantry_recipes, ingredients):
+    index = RecipeIngredientIndex(ttl=60)
+    rare = min(ingredients, key=lambda ingredient: sum(
+        ingredient.id in ids for ids in pantry_recipes.values()))
+    queryset = index.filter_queryset(Recipe.objects.all(),
+                                     exclude=[rare.id])
+    assert 'NOT' in str(queryset.query)
+    assert set(queryset.values_list('id', flat=True)) == expected_ids(
+        pantry_recipes, (), [rare.id], None, 100)
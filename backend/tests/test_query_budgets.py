@@ -0,0 +1,101 @@
+import pytest
+
+from .conftest import FULL_PAGE, IMAGE
+
+PAGE_SIZES = (1, FULL_PAGE)
+
+
+@pytest.mark.parametrize('limit', PAGE_SIZES)
+@pytest.mark.parametrize('url', (
+    '/api/recipes/?limit={limit}',
+    '/api/recipes/?limit={limit}&paginate=cursor',
+    '/api/recipes/?limit={limit}&is_favorited=1',
+    '/api/recipes/?limit={limit}&is_in_shopping_cart=1',
+    '/api/recipes/changes/?limit={limit}',
+    '/api/users/?limit={limit}',
+    '/api/users/subscriptions/?limit={limit}&recipes_limit=3',
+))
+def test_paginated_endpoints(query_budget, client, activity, url, limit):
+    response = query_budget.call(client.get, url.format(limit=limit))
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize('limit', PAGE_SIZES)
+def test_anonymous_recipe_list(query_budget, anonymous_client, recipes,
+                               limit):
+    response = query_budget.call(anonymous_client.get,
+                                 f'/api/recipes/?limit={limit}')
+    assert response.status_code == 200
+    assert len(response.data['results']) == limit
+
+
+def test_catalog_endpoints(query_budget, client, tags, ingredients):
+    for url in ('/api/tags/', f'/api/tags/{tags[0].id}/',
+                '/api/ingredients/', '/api/ingredients/?name=с',
+                f'/api/ingredients/{ingredients[0].id}/'):
+        assert query_budget.call(client.get, url).status_code == 200
+
+
+def test_detail_endpoints(query_budget, client, users, recipes, activity):
+    for url in (f'/api/recipes/{recipes[0].id}/',
+                f'/api/users/{users[1].id}/', '/api/users/me/',
+                '/api/recipes/download_shopping_cart/',
+                '/api/recipes/shopping_cart_summary/'):
+        assert query_budget.call(client.get, url).status_code == 200
+
+
+@pytest.mark.parametrize('action', ('favorite', 'shopping_cart'))
+def test_toggle_endpoints(query_budget, client, recipes, action):
+    url = f'/api/recipes/{recipes[0].id}/{action}/'
+    assert query_budget.call(client.post, url).status_code == 201
+    assert query_budget.call(client.delete, url).status_code == 204
+
+
+@pytest.mark.parametrize('count', PAGE_SIZES)
+@pytest.mark.parametrize('action', ('favorite', 'shopping_cart'))
+def test_bulk_endpoints(query_budget, client, recipes, action, count):
+    data = {'recipes': [recipe.id for recipe in recipes[:count]]}
+    url = f'/api/recipes/{action}/'
+    response = query_budget.call(client.post, url, data, format='json')
+    assert len(response.data['added']) == count
+    response = query_budget.call(client.delete, url, data, format='json')
+    assert len(response.data['removed']) == count
+
+
+def test_subscribe(query_budget, client, users):
+    url = f'/api/users/{users[1].id}/subscribe/'
+    assert query_budget.call(client.post, url).status_code == 201
+    assert query_budget.call(client.delete, url).status_code == 204
+
+
+def test_recipe_writes(query_budget, client, tags, ingredients):
+    response = query_budget.call(client.post, '/api/recipes/', {
+        'name': 'Омлет', 'text': 'Взбить яйца', 'cooking_time': 10,
+        'image': IMAGE, 'tags': [tags[0].id],
+        'ingredients': [{'id': ingredients[0].id, 'amount': 2}],
+    }, format='json')
+    assert response.status_code == 201
+    url = f'/api/recipes/{response.data["id"]}/'
+    response = query_budget.call(client.patch, url, {
+        'name': 'Омлет с сыром', 'tags': [tag.id for tag in tags],
+        'ingredients': [{'id': ingredient.id, 'amount': 1}
+                        for ingredient in ingredients],
+    }, format='json')
+    assert response.status_code == 200
+    assert query_budget.call(client.delete, url).status_code == 204
+
+
+def test_recipe_create_is_constant(query_budget, client, tags, ingredients):
+    client.get('/api/users/me/')
+    for count in (1, len(ingredients)):
+        response = query_budget.call(client.post, '/api/recipes/', {
+            'name': f'Салат из {count}', 'text': 'Нарезать',
+            'cooking_time': 5, 'image': IMAGE,
+            'tags': [tag.id for tag in tags[:count]],
+            'ingredients': [{'id': ingredient.id, 'amount': 1}
+                            for ingredient in ingredients[:count]],
+        }, format='json')
+        assert response.status_code == 201
+        assert len(response.data['ingredients']) == count
+    first, second = query_budget.results
+    assert first['queries'] == second['queries']
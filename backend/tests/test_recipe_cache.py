@@ -0,0 +1,49 @@
+def test_cached_list_follows_host(anonymous_client, recipes):
+    first = anonymous_client.get('/api/recipes/?limit=1',
+                                 HTTP_HOST='first.example.com')
+    second = anonymous_client.get('/api/recipes/?limit=1',
+                                  HTTP_HOST='second.example.com')
+    assert first['X-Cache'] == second['X-Cache'] == 'MISS'
+    assert first.data['next'].startswith('http://first.example.com/')
+    assert second.data['next'].startswith('http://second.example.com/')
+    response = anonymous_client.get('/api/recipes/?limit=1',
+                                    HTTP_HOST='second.example.com')
+    assert response['X-Cache'] == 'HIT'
+
+
+def test_cached_detail_follows_host(anonymous_client, recipes):
+    url = f'/api/recipes/{recipes[0].id}/'
+    anonymous_client.get(url, HTTP_HOST='first.example.com')
+    response = anonymous_client.get(url, HTTP_HOST='second.example.com')
+    assert response['X-Cache'] == 'MISS'
+    response = anonymous_client.get(url, HTTP_HOST='second.example.com')
+    assert response['X-Cache'] == 'HIT'
+
+
+def test_shared_documents_follow_host(settings, client, anonymous_client,
+                                      recipes):
+    settings.SYNC_SAFETY_MARGIN = 0
+    url = f'/api/recipes/{recipes[0].id}/'
+    client.get(url, HTTP_HOST='first.example.com')
+    for response in (
+            client.get(url, HTTP_HOST='second.example.com'),
+            anonymous_client.get(url, HTTP_HOST='second.example.com'),
+            anonymous_client.get('/api/recipes/',
+                                 HTTP_HOST='second.example.com'),
+            anonymous_client.get('/api/recipes/changes/',
+                                 HTTP_HOST='second.example.com')):
+        data = response.data
+        document = (data.get('results') or data.get('recipes') or [data])[0]
+        assert document['image'].startswith('http://second.example.com/')
+
+
+def test_author_rename_reaches_cached_list(
+        anonymous_client, recipes, django_capture_on_commit_callbacks):
+    anonymous_client.get('/api/recipes/')
+    author = recipes[-1].author
+    with django_capture_on_commit_callbacks(execute=True):
+        author.username = 'renamed'
+        author.save()
+    response = anonymous_client.get('/api/recipes/')
+    assert response['X-Cache'] == 'MISS'
+    assert response.data['results'][0]['author']['username'] == 'renamed'
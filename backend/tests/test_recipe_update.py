@@ -0,0 +1,78 @@
+import pytest
+
+from recipes.cart import live_cart_totals
+from recipes.models import IngredientQuantity, ShoppingCartIngredient
+from recipes.versions import RECIPES, author_key, get_versions, recipe_key
+
+from .conftest import client_for
+
+
+@pytest.fixture
+def recipe(recipes):
+    return recipes[2]
+
+
+@pytest.fixture
+def author_client(recipe):
+    return client_for(recipe.author)
+
+
+def ingredient_rows(recipe):
+    return set(IngredientQuantity.objects.filter(recipe=recipe).values_list(
+        'id', 'ingredient_id', 'amount'))
+
+
+def same_payload(recipe):
+    return {
+        'name': recipe.name, 'text': recipe.text,
+        'cooking_time': recipe.cooking_time,
+        'tags': list(recipe.tags.values_list('id', flat=True)),
+        'ingredients': [
+            {'id': row.ingredient_id, 'amount': row.amount}
+            for row in IngredientQuantity.objects.filter(recipe=recipe)],
+    }
+
+
+def test_title_patch_keeps_ingredient_rows(author_client, recipe):
+    rows = ingredient_rows(recipe)
+    response = author_client.patch(f'/api/recipes/{recipe.id}/',
+                                   {'name': 'Новое название'}, format='json')
+    assert response.status_code == 200
+    assert ingredient_rows(recipe) == rows
+
+
+def test_identical_patch_is_a_no_op(author_client, recipe,
+                                    django_capture_on_commit_callbacks):
+    keys = (RECIPES, author_key(recipe.author_id), recipe_key(recipe.id))
+    versions = get_versions(*keys)
+    rows = ingredient_rows(recipe)
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        response = author_client.patch(f'/api/recipes/{recipe.id}/',
+                                       same_payload(recipe), format='json')
+    assert response.status_code == 200
+    assert callbacks == []
+    assert get_versions(*keys) == versions
+    assert ingredient_rows(recipe) == rows
+    updated_at = recipe.updated_at
+    recipe.refresh_from_db()
+    assert recipe.updated_at == updated_at
+
+
+def test_amount_patch_updates_carts(client, author_client, users, recipe):
+    shopper_client = client_for(users[-1])
+    for cart_client in (client, shopper_client):
+        cart_client.post(f'/api/recipes/{recipe.id}/shopping_cart/')
+    payload = same_payload(recipe)
+    payload['ingredients'][0]['amount'] += 40
+    response = author_client.patch(f'/api/recipes/{recipe.id}/', payload,
+                                   format='json')
+    assert response.status_code == 200
+    ingredient_id = payload['ingredients'][0]['id']
+    assert set(ShoppingCartIngredient.objects.filter(
+        ingredient_id=ingredient_id).values_list('user_id', 'amount')) == {
+        (users[0].id, payload['ingredients'][0]['amount']),
+        (users[-1].id, payload['ingredients'][0]['amount'])}
+    assert {
+        (row.user_id, row.ingredient_id): row.amount
+        for row in ShoppingCartIngredient.objects.all()
+    } == live_cart_totals()
@@ -0,0 +1,13 @@
+from backend.routers import ReplicaRouter, primary, reading_from_replicas
+from recipes.models import Recipe
+
+
+def test_one_replica_per_request(settings):
+    settings.DATABASE_REPLICAS = [f'replica_{number}' for number in range(8)]
+    router = ReplicaRouter()
+    with reading_from_replicas():
+        chosen = {router.db_for_read(Recipe) for _ in range(50)}
+        with primary():
+            assert router.db_for_read(Recipe) == 'default'
+    assert len(chosen) == 1 and chosen < set(settings.DATABASE_REPLICAS)
+    assert router.db_for_read(Recipe) == 'default'
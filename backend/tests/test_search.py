@@ -0,0 +1,25 @@
+from .conftest import create_recipe
+
+
+def test_search_ranks_name_matches_first(client, user, tags, ingredients):
+    carbonara = create_recipe(user, tags, ingredients,
+                              name='Паста карбонара', text='Сливки и бекон')
+    newer = create_recipe(user, tags, ingredients,
+                          name='Ужин за полчаса', text='Отварить пасту')
+    create_recipe(user, tags, ingredients, name='Омлет', text='Яйца')
+    expected = [carbonara.id, newer.id]
+    for url in ('/api/recipes/?search=паст',
+                '/api/recipes/?search=паст&paginate=cursor'):
+        response = client.get(url)
+        assert [recipe['id'] for recipe in response.data['results']] == (
+            expected)
+
+
+def test_explicit_ordering_overrides_rank(client, user, tags, ingredients):
+    carbonara = create_recipe(user, tags, ingredients,
+                              name='Паста карбонара', text='Сливки и бекон')
+    newer = create_recipe(user, tags, ingredients,
+                          name='Ужин за полчаса', text='Отварить пасту')
+    response = client.get('/api/recipes/?search=паст&ordering=-id')
+    assert [recipe['id'] for recipe in response.data['results']] == [
+        newer.id, carbonara.id]
@@ -10,6 +10,10 @@ class User(AbstractUser):
     first_name = models.CharField('Имя', max_length=150, )
     last_name = models.CharField('Фамилия', max_length=150)
     password = models.CharField('Пароль', max_length=150)
+    recipes_count = models.PositiveIntegerField('Количество рецептов',
+                                                default=0, editable=False)
+    followers_count = models.PositiveIntegerField('Количество подписчиков',
+                                                  default=0, editable=False)
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username', 'first_name', 'last_name', 'password']
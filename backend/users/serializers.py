@@ -7,6 +7,35 @@ from .models import Subscription
 User = get_user_model()
 
 
+class SubscriptionCache:
+    def __init__(self, user):
+        self.user = user
+        self.checked = set()
+        self.following = set()
+
+    def is_subscribed(self, author_id, candidates=()):
+        if author_id not in self.checked:
+            author_ids = {author_id, *candidates} - self.checked
+            self.following.update(Subscription.objects.filter(
+                user=self.user, author_id__in=author_ids).values_list(
+                'author_id', flat=True))
+            self.checked.update(author_ids)
+        return author_id in self.following
+
+    def update(self, author_id, subscribed):
+        self.checked.add(author_id)
+        if subscribed:
+            self.following.add(author_id)
+        else:
+            self.following.discard(author_id)
+
+
+def get_subscription_cache(request):
+    if not hasattr(request, 'subscription_cache'):
+        request.subscription_cache = SubscriptionCache(request.user)
+    return request.subscription_cache
+
+
 class CreateUserSerializer(UserCreateSerializer):
     class Meta(UserCreateSerializer.Meta):
         model = User
@@ -23,7 +52,12 @@ class UserListSerializer(serializers.ModelSerializer):
                   'is_subscribed')
 
     def get_is_subscribed(self, obj):
-        user = self.context['request'].user
-        if user.is_authenticated:
-            return Subscription.objects.filter(user=user, author=obj).exists()
-        return False
+        if hasattr(obj, 'is_subscribed'):
+            return obj.is_subscribed
+        request = self.context['request']
+        if not request.user.is_authenticated:
+            return False
+        page = ()
+        if isinstance(self.parent, serializers.ListSerializer):
+            page = (user.id for user in self.parent.instance)
+        return get_subscription_cache(request).is_subscribed(obj.id, page)
@@ -1,4 +1,5 @@
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from djoser.views import UserViewSet
 from rest_framework import permissions, status
 from rest_framework.decorators import action
@@ -6,8 +7,11 @@ from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 
 from api.pagination import CustomPagination
-from api.serializers import SubscriptionSerializer
+from api.serializers import RecipesLimitSerializer, SubscriptionSerializer
+from recipes.db import change_counter
+from recipes.models import Recipe
 from .models import Subscription
+from .serializers import get_subscription_cache
 
 User = get_user_model()
 
@@ -15,8 +19,18 @@ User = get_user_model()
 class UserViewSet(UserViewSet):
     pagination_class = CustomPagination
 
+    def subscription_context(self, request, author_ids):
+        params = RecipesLimitSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        return {
+            'request': request,
+            'recipes': Recipe.objects.latest_by_author(
+                author_ids, params.validated_data.get('recipes_limit')),
+        }
+
     @action(detail=True, permission_classes=[permissions.IsAuthenticated],
             methods=['POST', 'DELETE'])
+    @transaction.atomic
     def subscribe(self, request, id=None):
         user = request.user
         author = get_object_or_404(User, id=id)
@@ -28,14 +42,22 @@ class UserViewSet(UserViewSet):
             if sub.exists():
                 return Response({'message': 'You are already subscribed'},
                                 status=status.HTTP_400_BAD_REQUEST)
+            context = self.subscription_context(request, [author.id])
+            subscription = Subscription.objects.create(user=user,
+                                                       author=author)
+            change_counter(User.objects.filter(pk=author.pk),
+                           'followers_count', 1)
+            get_subscription_cache(request).update(author.id, True)
             serializer = SubscriptionSerializer(
-                Subscription.objects.create(user=user, author=author),
-                context={'request': request}).data
+                subscription, context=context).data
             return Response(serializer, status=status.HTTP_201_CREATED)
         if sub.exists():
             obj = get_object_or_404(Subscription, user=user,
                                     author=author)
             obj.delete()
+            change_counter(User.objects.filter(pk=author.pk),
+                           'followers_count', -1)
+            get_subscription_cache(request).update(author.id, False)
             return Response({'message': 'You unsubscribed'},
                             status=status.HTTP_204_NO_CONTENT)
         if user == author:
@@ -48,7 +70,9 @@ class UserViewSet(UserViewSet):
             methods=['GET'])
     def subscriptions(self, request):
         queryset = self.paginate_queryset(
-            Subscription.objects.filter(user=request.user))
-        serializer = SubscriptionSerializer(queryset, many=True,
-                                            context={'request': request}).data
+            Subscription.objects.filter(user=request.user).select_related(
+                'author'))
+        serializer = SubscriptionSerializer(
+            queryset, many=True, context=self.subscription_context(
+                request, [sub.author_id for sub in queryset])).data
         return self.get_paginated_response(serializer)